@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Time each database export path against a (synthetic) WordPress database.
+
+Paths: fetch_orders_database.py (serial and partitioned), monitor_activity.py
+and the fetch_products_full.sh product query.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from db_connection import get_pooled_connection, close_pools
+from fetch_orders_database import fetch_woocommerce_orders, fetch_orders_partitioned, export_to_csv
+
+def timed(label, func):
+    """Run func, returning (label, rows, seconds)."""
+    started = time.perf_counter()
+    rows = func()
+    return label, rows, time.perf_counter() - started
+
+def bench_orders(website_config, prefix, workdir, partitions):
+    """Time the serial or partitioned order export including CSV writing."""
+    def run():
+        connection = get_pooled_connection(website_config, partitions + 1)
+        try:
+            if partitions > 1:
+                orders = [order for part in fetch_orders_partitioned(connection, website_config, prefix, partitions) for order in part]
+            else:
+                orders = fetch_woocommerce_orders(connection, prefix)
+        finally:
+            connection.close()
+        export_to_csv(orders, os.path.join(workdir, f'orders_{partitions}.csv'))
+        return len(orders)
+    return run
+
+def bench_activity(website_config, prefix, workdir, limit):
+    """Time monitor_activity.py as a subprocess using domain 1 environment variables."""
+    def run():
+        env = dict(os.environ, IP_1=website_config['DATABASE_IP'], DOMAIN_1=website_config.get('DOMAIN', 'bench'),
+                   DATABASE_NAME_1=website_config['DATABASE_NAME'], DATABASE_USER_1=website_config['DATABASE_USER'],
+                   DATABASE_PASSWORD_1=website_config['DATABASE_PASSWORD'], DATABASE_TABLE_PREFIX_1=prefix)
+        subprocess.run([sys.executable, os.path.join(REPO_DIR, 'monitor_activity.py'), '--domain', '1',
+                        '--limit', str(limit), '--csv', 'activity.csv'],
+                       cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        with open(os.path.join(workdir, 'data', 'activity.csv'), encoding='utf-8') as f:
+            return sum(1 for _ in f) - 1
+    return run
+
+def bench_products_script(website, website_config, workdir, limit):
+    """Time fetch_products_full.sh, answering its prompts on stdin: website, count, then no stock, price or sort filter."""
+    def run():
+        with open(os.path.join(workdir, 'config.json'), 'w') as f:
+            json.dump({'websites': {website: website_config}, 'default_website': website}, f)
+        subprocess.run(['bash', os.path.join(REPO_DIR, 'fetch_products_full.sh')], cwd=workdir, input=f"1\n{limit}\n\n\n\n\n",
+                       text=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        rows = 0
+        for name in os.listdir(os.path.join(workdir, 'data')):
+            if name.startswith('products_'):
+                with open(os.path.join(workdir, 'data', name), newline='', encoding='utf-8') as f:
+                    rows = sum(1 for _ in csv.reader(f)) - 1
+        return rows
+    return run
+
+def main():
+    """Run the database benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark database export paths')
+    parser.add_argument('--website', type=str, required=True, help='Website name in config.json')
+    parser.add_argument('--partitions', type=int, nargs='+', default=[1, 4], help='Partition counts for the order export')
+    parser.add_argument('--activity-limit', type=int, default=1000, help='Activity rows for monitor_activity.py')
+    parser.add_argument('--product-limit', type=int, default=1000, help='Products for fetch_products_full.sh')
+    args = parser.parse_args()
+
+    with open('config.json') as f:
+        website_config = json.load(f)['websites'][args.website]
+    prefix = website_config.get('DATABASE_TABLE_PREFIX', 'wp_')
+    workdir = tempfile.mkdtemp(prefix='bench_db_')
+    os.makedirs(os.path.join(workdir, 'data'))
+
+    benches = [(f'orders (partitions={n})', bench_orders(website_config, prefix, workdir, n)) for n in args.partitions]
+    benches.append(('monitor_activity.py', bench_activity(website_config, prefix, workdir, args.activity_limit)))
+    if shutil.which('mysql') and shutil.which('jq'):
+        benches.append(('fetch_products_full.sh', bench_products_script(args.website, website_config, workdir, args.product_limit)))
+    else:
+        print("Skipping fetch_products_full.sh: mysql and jq are required")
+
+    results = []
+    for label, func in benches:
+        try:
+            results.append(timed(label, func))
+        except Exception as e:
+            print(f"{label} failed: {e}")
+
+    print(f"\n{'Export path':<28}{'Rows':>10}{'Seconds':>10}{'Rows/s':>12}")
+    print("-" * 60)
+    for label, rows, seconds in results:
+        print(f"{label:<28}{rows:>10}{seconds:>10.2f}{rows / seconds if seconds else 0:>12.1f}")
+
+    close_pools()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the REST fetchers against the mock WooCommerce server.
+
+Runs each fetcher in a scratch directory, reports records per second, p50/p99
+page latency and peak RSS, and compares against the previous recorded run.
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+from mock_woocommerce_server import MockWooCommerceServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(REPO_DIR, 'benchmarks', 'results.jsonl')
+FETCHERS = {
+    'product_data': 'fetch_product_data_main_generic.py',
+    'product_titles': 'fetch_product_titles_main_generic.py',
+    'orders_api': 'fetch_orders_api_generic.py',
+    'products_combined': 'fetch_products_combined_generic.py'
+}
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def count_records(data_dir):
+    """Count records written by a fetcher: the data rows (excluding headers) of its largest CSV.
+
+    The combined fetcher writes one row per product to each of its CSVs, so summing would count products twice.
+    """
+    counts = [0]
+    for csv_file in glob.glob(os.path.join(data_dir, '*.csv')):
+        with open(csv_file, encoding='utf-8') as f:
+            counts.append(max(0, sum(1 for _ in f) - 1))
+    return max(counts)
+
+def git_revision():
+    """Short git revision of the working tree, used to label results."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_fetcher(name, script, server, extra_args):
+    """
+    Run one fetcher against the mock server in a scratch directory.
+
+    Returns:
+        dict: Benchmark result for the run
+    """
+    workdir = tempfile.mkdtemp(prefix=f'bench_{name}_')
+    site_url = f"http://127.0.0.1:{server.server_address[1]}"
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump({'websites': {'bench': {
+            'CONSUMER_KEY': 'ck_bench', 'CONSUMER_SECRET': 'cs_bench',
+            'SITE_URL': site_url, 'DOMAIN': '127.0.0.1'
+        }}, 'default_website': 'bench'}, f)
+    os.makedirs(os.path.join(workdir, 'data'))
+
+    server.reset_stats()
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, script), '--website', 'bench', *extra_args],
+                               cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    records = count_records(os.path.join(workdir, 'data'))
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'fetcher': name,
+        'exit_code': os.waitstatus_to_exitcode(status),
+        'records': records,
+        'seconds': round(elapsed, 3),
+        'records_per_second': round(records / elapsed, 1) if elapsed else 0.0,
+        'pages': len(server.page_latencies),
+        'bytes': server.bytes_sent,
+        'p50_page_ms': round(percentile(server.page_latencies, 0.50) * 1000, 2),
+        'p99_page_ms': round(percentile(server.page_latencies, 0.99) * 1000, 2),
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1)
+    }
+
+def load_previous_results():
+    """Latest recorded result per fetcher from the results file."""
+    previous = {}
+    if os.path.exists(RESULTS_FILE):
+        with open(RESULTS_FILE) as f:
+            for line in f:
+                result = json.loads(line)
+                previous[result['fetcher']] = result
+    return previous
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description='Benchmark REST fetchers against a mock WooCommerce server')
+    parser.add_argument('--fetchers', nargs='+', choices=list(FETCHERS), default=list(FETCHERS), help='Fetchers to run')
+    parser.add_argument('--products', type=int, default=500, help='Number of synthetic products')
+    parser.add_argument('--orders', type=int, default=500, help='Number of synthetic orders')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Random extra latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--body-bytes', type=int, default=200, help='Padding bytes per item')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Delay between page requests passed to every fetcher (default: 0, so sleep does not dominate)')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent (default: 10)')
+    parser.add_argument('--no-save', action='store_true', help='Do not append results to benchmarks/results.jsonl')
+    parser.add_argument('fetcher_args', nargs=argparse.REMAINDER, help='Extra arguments passed to every fetcher after --')
+    args = parser.parse_args()
+
+    server = MockWooCommerceServer(('127.0.0.1', 0), args.products, args.orders, args.latency,
+                                   args.jitter, args.error_rate, body_bytes=args.body_bytes)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    previous = load_previous_results()
+    revision, timestamp = git_revision(), datetime.now().isoformat(timespec='seconds')
+    extra_args = ['--delay', str(args.delay)] + [arg for arg in args.fetcher_args if arg != '--']
+    regressions = 0
+
+    print(f"{'Fetcher':<16}{'Records':>9}{'Rec/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'RSS MB':>9}{'Change':>10}")
+    print("-" * 72)
+    for name in args.fetchers:
+        result = run_fetcher(name, FETCHERS[name], server, extra_args)
+        result.update({'revision': revision, 'timestamp': timestamp, 'fetcher_args': extra_args})
+
+        change = ''
+        baseline = previous.get(name)
+        if baseline and baseline['records_per_second']:
+            delta = (result['records_per_second'] / baseline['records_per_second'] - 1) * 100
+            change = f"{delta:+.1f}%"
+            if delta < -args.threshold:
+                change += ' REGRESSION'
+                regressions += 1
+
+        print(f"{name:<16}{result['records']:>9}{result['records_per_second']:>10}{result['p50_page_ms']:>9}"
+              f"{result['p99_page_ms']:>9}{result['peak_rss_mb']:>9} {change}")
+        if not args.no_save:
+            with open(RESULTS_FILE, 'a') as f:
+                f.write(json.dumps(result) + '\n')
+
+    server.shutdown()
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Fill a local MySQL/MariaDB database with synthetic WordPress/WooCommerce data.
+
+Creates posts, postmeta, users, terms, woocommerce_order_items,
+woocommerce_order_itemmeta, the wc_product_meta_lookup, wc_order_stats and
+wc_order_product_lookup lookup tables and wsal_* tables with the default WordPress indexes, then inserts products, orders and activity rows in batches.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+BATCH_SIZE = 5000
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS {p}posts (
+        ID bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        post_author bigint(20) unsigned NOT NULL DEFAULT 0,
+        post_date datetime NOT NULL,
+        post_date_gmt datetime NOT NULL,
+        post_content longtext NOT NULL,
+        post_title text NOT NULL,
+        post_excerpt text NOT NULL,
+        post_status varchar(20) NOT NULL DEFAULT 'publish',
+        post_name varchar(200) NOT NULL DEFAULT '',
+        post_modified datetime NOT NULL,
+        post_modified_gmt datetime NOT NULL,
+        post_parent bigint(20) unsigned NOT NULL DEFAULT 0,
+        post_type varchar(20) NOT NULL DEFAULT 'post',
+        PRIMARY KEY (ID),
+        KEY post_name (post_name(191)),
+        KEY type_status_date (post_type, post_status, post_date, ID),
+        KEY post_parent (post_parent),
+        KEY post_author (post_author)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}postmeta (
+        meta_id bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        post_id bigint(20) unsigned NOT NULL DEFAULT 0,
+        meta_key varchar(255) DEFAULT NULL,
+        meta_value longtext,
+        PRIMARY KEY (meta_id),
+        KEY post_id (post_id),
+        KEY meta_key (meta_key(191))
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}users (
+        ID bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        user_login varchar(60) NOT NULL DEFAULT '',
+        user_email varchar(100) NOT NULL DEFAULT '',
+        PRIMARY KEY (ID),
+        KEY user_login_key (user_login)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}terms (
+        term_id bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        name varchar(200) NOT NULL DEFAULT '',
+        slug varchar(200) NOT NULL DEFAULT '',
+        PRIMARY KEY (term_id),
+        KEY slug (slug(191))
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}term_taxonomy (
+        term_taxonomy_id bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        term_id bigint(20) unsigned NOT NULL DEFAULT 0,
+        taxonomy varchar(32) NOT NULL DEFAULT '',
+        description longtext NOT NULL,
+        parent bigint(20) unsigned NOT NULL DEFAULT 0,
+        count bigint(20) NOT NULL DEFAULT 0,
+        PRIMARY KEY (term_taxonomy_id),
+        UNIQUE KEY term_id_taxonomy (term_id, taxonomy),
+        KEY taxonomy (taxonomy)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}term_relationships (
+        object_id bigint(20) unsigned NOT NULL DEFAULT 0,
+        term_taxonomy_id bigint(20) unsigned NOT NULL DEFAULT 0,
+        term_order int(11) NOT NULL DEFAULT 0,
+        PRIMARY KEY (object_id, term_taxonomy_id),
+        KEY term_taxonomy_id (term_taxonomy_id)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}woocommerce_order_items (
+        order_item_id bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        order_item_name text NOT NULL,
+        order_item_type varchar(200) NOT NULL DEFAULT '',
+        order_id bigint(20) unsigned NOT NULL,
+        PRIMARY KEY (order_item_id),
+        KEY order_id (order_id)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}woocommerce_order_itemmeta (
+        meta_id bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        order_item_id bigint(20) unsigned NOT NULL,
+        meta_key varchar(255) DEFAULT NULL,
+        meta_value longtext,
+        PRIMARY KEY (meta_id),
+        KEY order_item_id (order_item_id),
+        KEY meta_key (meta_key(32))
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}wc_product_meta_lookup (
+        product_id bigint(20) NOT NULL,
+        sku varchar(100) DEFAULT '',
+        min_price decimal(19,4) DEFAULT NULL,
+        max_price decimal(19,4) DEFAULT NULL,
+        stock_quantity double DEFAULT NULL,
+        stock_status varchar(100) DEFAULT 'instock',
+        total_sales bigint(20) DEFAULT 0,
+        PRIMARY KEY (product_id),
+        KEY stock_status (stock_status),
+        KEY stock_quantity (stock_quantity),
+        KEY min_max_price (min_price, max_price),
+        KEY sku (sku(50))
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}wc_order_stats (
+        order_id bigint(20) unsigned NOT NULL,
+        parent_id bigint(20) unsigned NOT NULL DEFAULT 0,
+        date_created datetime NOT NULL,
+        date_created_gmt datetime NOT NULL,
+        num_items_sold int(11) NOT NULL DEFAULT 0,
+        total_sales double NOT NULL DEFAULT 0,
+        tax_total double NOT NULL DEFAULT 0,
+        shipping_total double NOT NULL DEFAULT 0,
+        net_total double NOT NULL DEFAULT 0,
+        returning_customer tinyint(1) DEFAULT NULL,
+        status varchar(200) NOT NULL,
+        customer_id bigint(20) unsigned NOT NULL,
+        PRIMARY KEY (order_id),
+        KEY date_created (date_created),
+        KEY customer_id (customer_id),
+        KEY status (status(191))
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}wc_order_product_lookup (
+        order_item_id bigint(20) unsigned NOT NULL,
+        order_id bigint(20) unsigned NOT NULL,
+        product_id bigint(20) unsigned NOT NULL,
+        variation_id bigint(20) unsigned NOT NULL,
+        customer_id bigint(20) unsigned DEFAULT NULL,
+        date_created datetime NOT NULL,
+        product_qty int(11) NOT NULL,
+        product_net_revenue double NOT NULL DEFAULT 0,
+        product_gross_revenue double NOT NULL DEFAULT 0,
+        PRIMARY KEY (order_item_id),
+        KEY order_id (order_id),
+        KEY product_id (product_id),
+        KEY customer_id (customer_id),
+        KEY date_created (date_created)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}wsal_occurrences (
+        id bigint(20) NOT NULL AUTO_INCREMENT,
+        site_id bigint(20) NOT NULL DEFAULT 1,
+        alert_id bigint(20) NOT NULL,
+        created_on double NOT NULL,
+        user_id bigint(20) DEFAULT NULL,
+        object_id bigint(20) DEFAULT NULL,
+        severity bigint(20) NOT NULL DEFAULT 200,
+        PRIMARY KEY (id),
+        KEY site_alert_created (site_id, alert_id, created_on)
+    ) DEFAULT CHARSET=utf8mb4""",
+    """CREATE TABLE IF NOT EXISTS {p}wsal_metadata (
+        id bigint(20) NOT NULL AUTO_INCREMENT,
+        occurrence_id bigint(20) NOT NULL,
+        name varchar(100) NOT NULL,
+        value longtext NOT NULL,
+        PRIMARY KEY (id),
+        KEY occurrence_name (occurrence_id, name)
+    ) DEFAULT CHARSET=utf8mb4"""
+]
+
+TABLES = ['posts', 'postmeta', 'users', 'terms', 'term_taxonomy', 'term_relationships',
+          'woocommerce_order_items', 'woocommerce_order_itemmeta', 'wc_product_meta_lookup', 'wc_order_stats', 'wc_order_product_lookup',
+          'wsal_occurrences', 'wsal_metadata']
+
+# Meta keys every order carries, followed by plugin keys present on a random subset
+ORDER_CORE_META_KEYS = [
+    '_billing_first_name', '_billing_last_name', '_billing_email', '_billing_phone', '_order_total',
+    '_payment_method_title', '_payment_method', '_billing_company', '_billing_address_1', '_billing_address_2',
+    '_billing_city', '_billing_state', '_billing_postcode', '_billing_country', '_shipping_first_name',
+    '_shipping_last_name', '_shipping_company', '_shipping_address_1', '_shipping_address_2', '_shipping_city',
+    '_shipping_state', '_shipping_postcode', '_shipping_country', '_order_key', '_customer_user',
+    '_order_currency', '_prices_include_tax', '_customer_ip_address', '_customer_user_agent', '_created_via',
+    '_cart_hash', '_order_shipping', '_order_shipping_tax', '_order_tax', '_cart_discount', '_cart_discount_tax',
+    '_order_version', '_date_paid', '_paid_date', '_recorded_sales', '_order_stock_reduced'
+]
+ORDER_PLUGIN_META_KEYS = [f'_plugin_meta_{i}' for i in range(60)] + [
+    '_wc_order_attribution_source_type', '_wc_order_attribution_utm_source', '_wc_order_attribution_session_pages',
+    '_wc_order_attribution_device_type', '_ga_tracked', '_transaction_id', '_edit_lock', '_download_permissions_granted'
+]
+PRODUCT_META_KEYS = ['_sku', '_regular_price', '_sale_price', '_stock_status', '_stock', '_manage_stock',
+                     '_weight', '_length', '_width', '_height', 'total_sales', '_tax_status', '_visibility']
+PAYMENT_METHODS = ['Credit Card', 'PayPal', 'Cash on delivery', 'Direct bank transfer', 'UPI']
+ORDER_STATUSES = ['wc-completed'] * 6 + ['wc-processing'] * 2 + ['wc-on-hold', 'wc-cancelled', 'wc-refunded']
+ALERT_IDS = [9073] * 5 + [1000, 1001, 2065, 2002, 9015]
+
+def insert_rows(connection, cursor, table, columns, rows):
+    """Insert rows with one multi-row INSERT per batch and commit."""
+    if rows:
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})", rows)
+        connection.commit()
+
+class BatchWriter:
+    """Buffer rows per table and flush them in BATCH_SIZE multi-row inserts."""
+
+    def __init__(self, connection, prefix):
+        self.connection, self.prefix = connection, prefix
+        self.cursor = connection.cursor()
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, columns, row):
+        buffer = self.buffers.setdefault((table, columns), [])
+        buffer.append(row)
+        if len(buffer) >= BATCH_SIZE:
+            self.flush(table, columns)
+
+    def flush(self, table=None, columns=None):
+        keys = [(table, columns)] if table else list(self.buffers)
+        for key in keys:
+            rows = self.buffers.get(key, [])
+            insert_rows(self.connection, self.cursor, f"{self.prefix}{key[0]}", key[1], rows)
+            self.counts[key[0]] = self.counts.get(key[0], 0) + len(rows)
+            self.buffers[key] = []
+
+POST_COLUMNS = ('ID', 'post_author', 'post_date', 'post_date_gmt', 'post_content', 'post_title', 'post_excerpt',
+                'post_status', 'post_name', 'post_modified', 'post_modified_gmt', 'post_parent', 'post_type')
+META_COLUMNS = ('post_id', 'meta_key', 'meta_value')
+PRODUCT_LOOKUP_COLUMNS = ('product_id', 'sku', 'min_price', 'max_price', 'stock_quantity', 'stock_status', 'total_sales')
+STATS_COLUMNS = ('order_id', 'date_created', 'date_created_gmt', 'num_items_sold', 'total_sales', 'net_total',
+                 'status', 'customer_id')
+LOOKUP_COLUMNS = ('order_item_id', 'order_id', 'product_id', 'variation_id', 'customer_id', 'date_created',
+                  'product_qty', 'product_net_revenue', 'product_gross_revenue')
+
+def add_post(writer, post_id, post_type, status, title, date, content='', excerpt='', parent=0):
+    """Queue one posts row."""
+    stamp = date.strftime('%Y-%m-%d %H:%M:%S')
+    writer.add('posts', POST_COLUMNS, (post_id, 1, stamp, stamp, content, title, excerpt, status,
+                                       f'{post_type}-{post_id}', stamp, stamp, parent, post_type))
+
+def generate_catalogue(writer, rng, products, categories):
+    """Queue users, category terms, products, product images and their meta."""
+    for user_id in range(1, 201):
+        writer.add('users', ('ID', 'user_login', 'user_email'), (user_id, f'user{user_id}', f'user{user_id}@example.com'))
+
+    # Two-level category tree: every fifth category is a top-level parent
+    for term_id in range(1, categories + 1):
+        parent = 0 if term_id % 5 == 1 else term_id - (term_id - 1) % 5
+        writer.add('terms', ('term_id', 'name', 'slug'), (term_id, f'Category {term_id}', f'category-{term_id}'))
+        writer.add('term_taxonomy', ('term_taxonomy_id', 'term_id', 'taxonomy', 'description', 'parent'),
+                   (term_id, term_id, 'product_cat', '', parent))
+
+    now = datetime.now()
+    for product_id in range(1, products + 1):
+        image_id = products + product_id
+        date = now - timedelta(days=rng.randint(0, 1500))
+        add_post(writer, product_id, 'product', 'publish', f'Product {product_id}', date,
+                 content=f'<p>Description for product {product_id}</p>' * 5, excerpt=f'Short description {product_id}')
+        add_post(writer, image_id, 'attachment', 'inherit', f'Image {product_id}', date, parent=product_id)
+        writer.add('postmeta', META_COLUMNS, (image_id, '_wp_attached_file', f'2024/01/product-{product_id}.jpg'))
+        price = f'{rng.uniform(1, 500):.2f}'
+        writer.add('postmeta', META_COLUMNS, (product_id, '_price', price))
+        writer.add('postmeta', META_COLUMNS, (product_id, '_thumbnail_id', str(image_id)))
+        meta = {key: str(rng.randint(0, 100)) for key in PRODUCT_META_KEYS}
+        meta.update({'_regular_price': price, '_sku': f'SKU-{product_id}',
+                     '_stock_status': rng.choice(('instock', 'instock', 'outofstock'))})
+        for key, value in meta.items():
+            writer.add('postmeta', META_COLUMNS, (product_id, key, value))
+        writer.add('wc_product_meta_lookup', PRODUCT_LOOKUP_COLUMNS,
+                   (product_id, meta['_sku'], price, price, meta['_stock'], meta['_stock_status'], meta['total_sales']))
+        for term_id in rng.sample(range(1, categories + 1), rng.randint(1, 2)):
+            writer.add('term_relationships', ('object_id', 'term_taxonomy_id'), (product_id, term_id))
+
+def generate_orders(writer, rng, orders, first_order_id, products, days, extra_meta):
+    """Queue shop_order posts, their meta, line items, item meta and analytics lookup rows."""
+    now = datetime.now()
+    item_id = 0
+    for index in range(orders):
+        order_id = first_order_id + index
+        date = now - timedelta(seconds=rng.randint(0, days * 86400))
+        status, customer_id, stamp = rng.choice(ORDER_STATUSES), rng.randint(0, 200), date.strftime('%Y-%m-%d %H:%M:%S')
+        add_post(writer, order_id, 'shop_order', status, f'Order &ndash; {order_id}', date)
+
+        total, items_sold = 0.0, 0
+        for _ in range(rng.randint(1, 4)):
+            item_id += 1
+            product_id, qty = rng.randint(1, products), rng.randint(1, 5)
+            line_total = round(rng.uniform(1, 500) * qty, 2)
+            total += line_total
+            items_sold += qty
+            writer.add('woocommerce_order_items', ('order_item_id', 'order_item_name', 'order_item_type', 'order_id'),
+                       (item_id, f'Product {product_id}', 'line_item', order_id))
+            for key, value in (('_product_id', product_id), ('_variation_id', 0), ('_qty', qty),
+                               ('_line_total', line_total), ('_line_subtotal', line_total), ('_tax_class', ''),
+                               ('_line_subtotal_tax', 0), ('_line_tax', 0), ('_line_tax_data', 'a:0:{}'),
+                               ('_reduced_stock', qty)):
+                writer.add('woocommerce_order_itemmeta', ('order_item_id', 'meta_key', 'meta_value'), (item_id, key, str(value)))
+            writer.add('wc_order_product_lookup', LOOKUP_COLUMNS,
+                       (item_id, order_id, product_id, 0, customer_id, stamp, qty, line_total, line_total))
+
+        item_id += 1
+        writer.add('woocommerce_order_items', ('order_item_id', 'order_item_name', 'order_item_type', 'order_id'),
+                   (item_id, 'Flat rate', 'shipping', order_id))
+        for key, value in (('method_id', 'flat_rate'), ('cost', '5.00'), ('total_tax', '0')):
+            writer.add('woocommerce_order_itemmeta', ('order_item_id', 'meta_key', 'meta_value'), (item_id, key, value))
+
+        for key in ORDER_CORE_META_KEYS:
+            value = {
+                '_billing_first_name': f'First{order_id}', '_billing_last_name': f'Last{order_id}',
+                '_billing_email': f'customer{order_id}@example.com', '_billing_phone': f'555{order_id:07d}',
+                '_order_total': f'{total:.2f}', '_payment_method_title': rng.choice(PAYMENT_METHODS),
+                '_customer_user': str(customer_id)
+            }.get(key, f'value-{rng.randint(0, 9999)}')
+            writer.add('postmeta', META_COLUMNS, (order_id, key, value))
+        for key in rng.sample(ORDER_PLUGIN_META_KEYS, rng.randint(0, min(extra_meta, len(ORDER_PLUGIN_META_KEYS)))):
+            writer.add('postmeta', META_COLUMNS, (order_id, key, f'plugin-value-{rng.randint(0, 99999)}'))
+        writer.add('wc_order_stats', STATS_COLUMNS,
+                   (order_id, stamp, stamp, items_sold, round(total, 2), round(total, 2), status, customer_id))
+
+        if index and index % 10000 == 0:
+            print(f"  {index} orders generated...")
+
+def generate_activity(writer, rng, occurrences, products, days):
+    """Queue WP Activity Log occurrences and their metadata."""
+    now = time.time()
+    for occurrence_id in range(1, occurrences + 1):
+        alert_id = rng.choice(ALERT_IDS)
+        writer.add('wsal_occurrences', ('id', 'alert_id', 'created_on', 'user_id', 'object_id'),
+                   (occurrence_id, alert_id, now - rng.uniform(0, days * 86400), rng.randint(1, 200), rng.randint(1, products)))
+        for name, value in (('ClientIP', f'10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}'),
+                            ('UserAgent', 'Mozilla/5.0'), ('PostID', str(rng.randint(1, products)))):
+            writer.add('wsal_metadata', ('occurrence_id', 'name', 'value'), (occurrence_id, name, value))
+
+def load_website_config(website):
+    """Load one website's database settings from config.json."""
+    with open('config.json') as f:
+        return json.load(f)['websites'][website]
+
+def main():
+    """Create and fill the synthetic database."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic WordPress/WooCommerce database')
+    parser.add_argument('--website', type=str, required=True, help='Website name in config.json pointing at the target database')
+    parser.add_argument('--orders', type=int, default=10000, help='Number of orders (10k to 10M)')
+    parser.add_argument('--products', type=int, default=2000, help='Number of products')
+    parser.add_argument('--categories', type=int, default=50, help='Number of product categories')
+    parser.add_argument('--occurrences', type=int, default=10000, help='Number of activity log occurrences')
+    parser.add_argument('--extra-meta', type=int, default=40, help='Maximum plugin meta keys per order on top of the core keys')
+    parser.add_argument('--days', type=int, default=730, help='Spread order dates over this many days')
+    parser.add_argument('--prefix', type=str, help='Table prefix (default: DATABASE_TABLE_PREFIX from config.json)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+    parser.add_argument('--reset', action='store_true', help='Drop the generated tables first')
+    parser.add_argument('--force', action='store_true', help='Allow writing to a non-local database host')
+    args = parser.parse_args()
+
+    config = load_website_config(args.website)
+    prefix = args.prefix or config.get('DATABASE_TABLE_PREFIX', 'wp_')
+    if config['DATABASE_IP'] not in LOCAL_HOSTS and not args.force:
+        print(f"Refusing to write synthetic data to non-local host {config['DATABASE_IP']}. Use --force to override.")
+        sys.exit(1)
+
+    connection = mysql.connector.connect(host=config['DATABASE_IP'], port=int(config.get('DATABASE_PORT', 3306)),
+                                         database=config['DATABASE_NAME'], user=config['DATABASE_USER'],
+                                         password=config['DATABASE_PASSWORD'], autocommit=False)
+    cursor = connection.cursor()
+    cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    if args.reset:
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {prefix}{table}")
+    for statement in SCHEMA:
+        cursor.execute(statement.format(p=prefix))
+
+    rng = random.Random(args.seed)
+    writer = BatchWriter(connection, prefix)
+    started = time.perf_counter()
+    print(f"Generating {args.products} products, {args.orders} orders and {args.occurrences} activity rows into {prefix}*")
+    generate_catalogue(writer, rng, args.products, args.categories)
+    generate_orders(writer, rng, args.orders, 2 * args.products + 1, args.products, args.days, args.extra_meta)
+    generate_activity(writer, rng, args.occurrences, args.products, args.days)
+    writer.flush()
+
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    for table, count in writer.counts.items():
+        print(f"  {prefix}{table}: {count} rows")
+    cursor.close()
+    connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the WooCommerce REST API, serving synthetic products and orders.
+
+Serves /wp-json/wc/v3/products, /products/categories and /orders with X-WP-Total and
+X-WP-TotalPages headers, ETag validation, order/after/before/include/_fields parameters,
+optional latency, jitter and error injection.
+"""
+
+import json
+import hashlib
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+API_PREFIX = '/wp-json/wc/v3/'
+STATUSES = ('processing', 'completed', 'completed', 'completed', 'on-hold', 'cancelled', 'refunded')
+# Two-level category tree: every fifth category is a top-level parent
+CATEGORIES = [{'id': i, 'name': f'Category {i}', 'slug': f'category-{i}', 'parent': i - (i - 1) % 5 if (i - 1) % 5 else 0}
+              for i in range(1, 41)]
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+def make_product(product_id, body_bytes):
+    """Build one synthetic product shaped like a /products response item."""
+    rng = random.Random(product_id)
+    modified = (EPOCH + timedelta(minutes=product_id * 37)).strftime('%Y-%m-%dT%H:%M:%S')
+    return {
+        'id': product_id,
+        'name': f'Product {product_id}',
+        'slug': f'product-{product_id}',
+        'permalink': f'https://shop.example.com/product/product-{product_id}/',
+        'date_modified_gmt': modified,
+        'sku': f'SKU-{product_id:07d}',
+        'price': f'{rng.uniform(1, 500):.2f}',
+        'regular_price': f'{rng.uniform(1, 500):.2f}',
+        'stock_status': rng.choice(('instock', 'instock', 'outofstock')),
+        'categories': [{key: category[key] for key in ('id', 'name', 'slug')}
+                       for category in rng.sample(CATEGORIES, rng.randint(0, 3))],
+        'images': [{'id': product_id * 10 + i, 'src': f'https://shop.example.com/wp-content/uploads/p{product_id}_{i}.jpg'}
+                   for i in range(rng.randint(0, 3))],
+        'description': 'x' * body_bytes,
+        'meta_data': [{'id': i, 'key': f'_meta_{i}', 'value': str(i)} for i in range(10)]
+    }
+
+def order_created(order_id):
+    """Creation time of a synthetic order; increases with the order ID."""
+    return EPOCH + timedelta(minutes=order_id * 53)
+
+def make_order(order_id, body_bytes):
+    """Build one synthetic order shaped like an /orders response item."""
+    rng = random.Random(-order_id)
+    created = order_created(order_id)
+    return {
+        'id': order_id,
+        'status': rng.choice(STATUSES),
+        'total': f'{rng.uniform(5, 900):.2f}',
+        'customer_id': rng.randint(0, 5000),
+        'date_created': created.strftime('%Y-%m-%dT%H:%M:%S'),
+        'date_created_gmt': created.strftime('%Y-%m-%dT%H:%M:%S'),
+        'date_modified_gmt': (created + timedelta(days=rng.randint(0, 10))).strftime('%Y-%m-%dT%H:%M:%S'),
+        'billing': {
+            'first_name': f'First{order_id}', 'last_name': f'Last{order_id}',
+            'email': f'customer{order_id}@example.com', 'phone': f'555{order_id:07d}'
+        },
+        'line_items': [{'id': order_id * 10 + i, 'product_id': rng.randint(1, 10000), 'quantity': rng.randint(1, 5)}
+                       for i in range(rng.randint(1, 4))],
+        'customer_note': 'x' * body_bytes
+    }
+
+class MockWooCommerceServer(ThreadingHTTPServer):
+    """HTTP server holding the synthetic catalogue, settings and per-page latency log."""
+
+    daemon_threads = True
+
+    def __init__(self, address, products=1000, orders=1000, latency=0.0, jitter=0.0,
+                 error_rate=0.0, max_per_page=100, body_bytes=200):
+        super().__init__(address, MockRequestHandler)
+        self.collections = {
+            'products': (products, make_product, None),
+            'orders': (orders, make_order, order_created),
+            'products/categories': (len(CATEGORIES), lambda term_id, _: CATEGORIES[term_id - 1], None)
+        }
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.max_per_page, self.body_bytes = max_per_page, body_bytes
+        self.page_latencies = []
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def reset_stats(self):
+        """Clear the latency log and byte counter between benchmark runs."""
+        with self.lock:
+            self.page_latencies, self.bytes_sent = [], 0
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Serve paginated collections from the synthetic catalogue."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        endpoint = url.path[len(API_PREFIX):].strip('/') if url.path.startswith(API_PREFIX) else None
+        server = self.server
+
+        if endpoint not in server.collections:
+            return self.send_json(404, {'code': 'rest_no_route', 'message': 'No route was found'}, started)
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if random.random() < server.error_rate:
+            return self.send_json(500, {'code': 'internal_server_error', 'message': 'Injected error'}, started)
+
+        total, make_item, created = server.collections[endpoint]
+        try:
+            page = max(1, int(params.get('page', 1)))
+            per_page = min(server.max_per_page, max(1, int(params.get('per_page', 10))))
+            after, before = (datetime.fromisoformat(params[name]).replace(tzinfo=timezone.utc) if name in params else None
+                             for name in ('after', 'before'))
+        except ValueError:
+            return self.send_json(400, {'code': 'rest_invalid_param', 'message': 'Invalid parameter'}, started)
+
+        # Creation time grows with the ID, so a date range is a contiguous ID range
+        ids = range(1, total + 1)
+        if created and (after or before):
+            ids = [item_id for item_id in ids if (not after or created(item_id) > after)
+                   and (not before or created(item_id) < before)]
+        if 'include' in params:
+            include = {int(item_id) for item_id in params['include'].split(',') if item_id.isdigit()}
+            ids = [item_id for item_id in ids if item_id in include]
+        if params.get('order', 'desc') == 'desc':
+            ids = ids[::-1]
+        total = len(ids)
+        items = [make_item(item_id, server.body_bytes) for item_id in ids[(page - 1) * per_page:page * per_page]]
+        if '_fields' in params:
+            fields = params['_fields'].split(',')
+            items = [{field: item[field] for field in fields if field in item} for item in items]
+        headers = {'X-WP-Total': str(total), 'X-WP-TotalPages': str(-(-total // per_page))}
+        self.send_json(200, items, started, headers, etag=True)
+
+    def send_json(self, status, payload, started, headers=None, etag=False):
+        body = json.dumps(payload).encode('utf-8')
+        if etag:
+            headers['ETag'] = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.page_latencies.append(time.perf_counter() - started)
+            self.server.bytes_sent += len(body)
+
+def main():
+    """Run the mock server until interrupted."""
+    parser = argparse.ArgumentParser(description='Mock WooCommerce REST API with synthetic data')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--products', type=int, default=1000, help='Number of synthetic products')
+    parser.add_argument('--orders', type=int, default=1000, help='Number of synthetic orders')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixed latency per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--max-per-page', type=int, default=100, help='Largest per_page honoured (default: 100)')
+    parser.add_argument('--body-bytes', type=int, default=200, help='Padding bytes per item to simulate large payloads')
+    args = parser.parse_args()
+
+    server = MockWooCommerceServer(('127.0.0.1', args.port), args.products, args.orders, args.latency,
+                                   args.jitter, args.error_rate, args.max_per_page, args.body_bytes)
+    print(f"Mock WooCommerce API listening on http://127.0.0.1:{args.port}{API_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+if __name__ == "__main__":
+    main()
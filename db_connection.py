@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Shared MySQL connection pooling for the database tools.
+"""
+
+import queue
+import threading
+import mysql.connector
+from mysql.connector import pooling
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+_pools = {}
+# Connections each pool has opened so far, keyed by pool name; pools open them on demand
+_opened = {}
+# Pools replaced by a larger one; connections still checked out return to them
+_retired = []
+_pools_lock = threading.Lock()
+
+def _flag(value):
+    """Interpret a config value from config.json or .env as a boolean."""
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _close_idle(pool):
+    """Disconnect every idle connection queued in a pool; get_connection() would first reconnect dead ones."""
+    with pooling.CONNECTION_POOL_LOCK:
+        while True:
+            try:
+                connection = pool._cnx_queue.get(block=False)
+            except queue.Empty:
+                return
+            try:
+                connection.disconnect()
+            except mysql.connector.Error:
+                pass
+
+def get_pool(website_config, pool_size=None):
+    """
+    Get the connection pool for a website, creating it on first use.
+
+    The pool holds pool_size connections, or DATABASE_POOL_SIZE if that is
+    larger, up to the connector's limit of 32. Connections are opened on
+    demand, and a pool that is too small is replaced by a larger one.
+
+    Args:
+        website_config (dict): Website configuration from config.json
+        pool_size (int, optional): Minimum pool size, e.g. the number of parallel workers
+
+    Optional website config keys:
+        DATABASE_PORT (default 3306), DATABASE_POOL_SIZE (default: the requested size),
+        DATABASE_CONNECT_TIMEOUT in seconds (default 10),
+        DATABASE_COMPRESS: true, false or auto (compress for remote hosts only)
+
+    Returns:
+        MySQLConnectionPool: Pool shared by every caller for this website
+    """
+    host = website_config['DATABASE_IP']
+    port = int(website_config.get('DATABASE_PORT', 3306))
+    key = (host, port, website_config['DATABASE_NAME'], website_config['DATABASE_USER'])
+    size = min(max(int(website_config.get('DATABASE_POOL_SIZE', 1)), pool_size or 1), pooling.CNX_POOL_MAXSIZE)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.pool_size >= size:
+            return pool
+        if pool is not None:
+            _close_idle(pool)
+            _retired.append(pool)
+
+        compress = str(website_config.get('DATABASE_COMPRESS', 'false')).strip().lower()
+        compress = host not in LOCAL_HOSTS if compress == 'auto' else _flag(compress)
+
+        # Without connection arguments the pool opens nothing up front; set_config supplies them
+        pool = pooling.MySQLConnectionPool(
+            pool_name=f"woocommerce_{len(_opened) + 1}",
+            pool_size=size,
+            pool_reset_session=True
+        )
+        pool.set_config(
+            host=host,
+            port=port,
+            database=website_config['DATABASE_NAME'],
+            user=website_config['DATABASE_USER'],
+            password=website_config['DATABASE_PASSWORD'],
+            connection_timeout=int(website_config.get('DATABASE_CONNECT_TIMEOUT', 10)),
+            compress=compress
+        )
+        _pools[key] = pool
+        _opened[pool.pool_name] = 0
+        return pool
+
+def _borrow(pool):
+    """Take an idle connection from a pool, opening a new one while the pool is below its size."""
+    # One lock around the get, add and get so no other borrower takes the connection just added
+    with _pools_lock:
+        try:
+            return pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            if _opened[pool.pool_name] >= pool.pool_size:
+                raise
+        pool.add_connection()
+        _opened[pool.pool_name] += 1
+        return pool.get_connection()
+
+def check_connection(connection):
+    """
+    Health check a connection, reconnecting once if the server dropped it.
+
+    Args:
+        connection: MySQL database connection
+
+    Returns:
+        bool: True if the connection is usable
+    """
+    try:
+        connection.ping(reconnect=True, attempts=2, delay=1)
+        return True
+    except mysql.connector.Error:
+        return False
+
+def get_pooled_connection(website_config, pool_size=None):
+    """
+    Borrow a health checked connection from the website's pool.
+
+    Calling close() on the returned connection hands it back to the pool.
+    Set DATABASE_NET_TIMEOUT (seconds) in the website config to bound
+    reads and writes on slow links.
+
+    Args:
+        website_config (dict): Website configuration from config.json
+        pool_size (int, optional): Minimum pool size, e.g. the number of parallel workers
+
+    Returns:
+        PooledMySQLConnection: Database connection
+
+    Raises:
+        mysql.connector.Error: If no healthy connection can be obtained
+    """
+    connection = _borrow(get_pool(website_config, pool_size))
+    if not check_connection(connection):
+        connection.close()
+        raise mysql.connector.errors.InterfaceError("Pooled connection failed health check")
+
+    net_timeout = website_config.get('DATABASE_NET_TIMEOUT')
+    if net_timeout:
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION net_read_timeout = %s, net_write_timeout = %s",
+                       (int(net_timeout), int(net_timeout)))
+        cursor.close()
+    return connection
+
+def decode_row(row):
+    """
+    Decode bytes values that prepared (binary protocol) cursors return for text columns.
+
+    Args:
+        row (dict): Row from a dictionary cursor
+
+    Returns:
+        dict: Row with bytes values decoded as UTF-8
+    """
+    return {key: value.decode('utf-8') if isinstance(value, (bytes, bytearray)) else value
+            for key, value in row.items()}
+
+def close_pools():
+    """Close every idle pooled connection, e.g. before the process exits."""
+    with _pools_lock:
+        for pool in list(_pools.values()) + _retired:
+            _close_idle(pool)
+        _pools.clear()
+        _retired.clear()
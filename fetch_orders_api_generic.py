@@ -4,38 +4,25 @@ Enhanced Order Data Fetcher with Multi-Website Support
 Supports both JSON config and environment variables for multiple websites
 """
 
-import requests
-import time
-import json
-import csv
 import os
 import sys
+import time
 import argparse
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-def get_current_page(website_name="default"):
-    """Retrieve the current page from the property file."""
-    page_file = f"data/current_page_{website_name}.txt"
-    try:
-        with open(page_file, "r") as file:
-            return int(file.read().strip())
-    except FileNotFoundError:
-        return 1
-    except ValueError:
-        print("⚠️ Warning: Invalid page number in current_page.txt. Starting from page 1.")
-        return 1
+import requests
+from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from woo_pipeline import (get_website_config, list_websites, select_website_interactive,
+                          REST_REQUIRED_KEYS, DEFAULT_PER_PAGE, STABLE_ORDER, Checkpoint, CsvSink, JsonlSink, SeenIds,
+                          run_pipeline, fetch_page, with_retries, page_query, extract_records, plan_export,
+                          add_pipeline_arguments, pipeline_options)
+from run_metrics import metrics, add_metrics_arguments
+from profiling import profiled, add_profile_arguments
+from order_filters import OrderFilter, add_filter_arguments, API_DATE_FORMAT
+from json_codec import to_plain
 
-def save_current_page(page, website_name="default"):
-    """Save the current page number to the property file."""
-    page_file = f"data/current_page_{website_name}.txt"
-    try:
-        with open(page_file, "w") as file:
-            file.write(str(page))
-    except IOError as e:
-        print(f"⚠️ Warning: Could not save current page: {e}")
+ORDER_CSV_HEADER = ['Name', 'Email', 'Phone', 'Order ID', 'Order Status', 'Order Amount']
+ORDER_FIELDS = ['name', 'email', 'phone', 'order_id', 'order_status', 'order_amount']
 
 def extract_order_data(order):
     """Extract required data fields from an order."""
@@ -52,188 +39,178 @@ def extract_order_data(order):
         print(f"⚠️ Warning: Could not extract field {e} from order {order.get('id', 'unknown')}")
         return None
 
-def fetch_orders(page, config):
-    """Fetch order data from WooCommerce API."""
-    api_url = f"{config['SITE_URL']}/wp-json/wc/v3/orders"
-    params = {
-        'page': page,
-        'per_page': 50,
-        'consumer_key': config['CONSUMER_KEY'],
-        'consumer_secret': config['CONSUMER_SECRET']
-    }
-    
-    try:
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        orders = response.json()
-        
-        order_data = []
-        for order in orders:
-            data = extract_order_data(order)
-            if data:
-                order_data.append(data)
-        
-        return order_data, len(orders) == 50
-    except requests.RequestException as e:
-        print(f"❌ Error fetching data from API: {e}")
-        return [], False
-    except (KeyError, json.JSONDecodeError) as e:
-        print(f"❌ Error processing API response: {e}")
-        return [], False
+def order_row_from_item(order):
+    """CSV row for the order export, or None if the order is incomplete."""
+    data = extract_order_data(order)
+    return [data[field] for field in ORDER_FIELDS] if data else None
 
-def write_orders_to_csv(orders, csv_file, website_name="default"):
-    """Write order data to a CSV file."""
-    try:
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(csv_file), exist_ok=True)
-        # Open in append mode to add new orders
-        mode = 'a' if get_current_page(website_name) > 1 else 'w'
-        with open(csv_file, mode, newline='', encoding='utf-8') as f:
-            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-            # Write header if it's a new file
-            if mode == 'w':
-                writer.writerow(['Name', 'Email', 'Phone', 'Order ID', 'Order Status', 'Order Amount'])
-            # Write order data
-            for order in orders:
-                writer.writerow([
-                    order["name"],
-                    order["email"],
-                    order["phone"],
-                    order["order_id"],
-                    order["order_status"],
-                    order["order_amount"]
-                ])
-        print(f"✓ Successfully wrote {len(orders)} orders to {csv_file}")
-    except Exception as e:
-        print(f"❌ Error writing to CSV file: {e}")
+def order_sinks(website_name, raw_store=False):
+    """The order CSV, plus with raw_store the raw JSONL store that reconcile.py diffs against."""
+    sinks = [CsvSink(f"data/order_data_{website_name}.csv", ORDER_CSV_HEADER, order_row_from_item, 'orders')]
+    if raw_store:
+        sinks.append(JsonlSink(f"data/orders_raw_{website_name}.jsonl", 'raw orders'))
+    return sinks
 
-def fetch_woocommerce_orders(config, website_name="default"):
-    """Main function to fetch order data and save them to CSV."""
+def fetch_woocommerce_orders(config, website_name="default", order_filter=None, raw_store=False, **options):
+    """Main function to fetch order data and save them to CSV.
+
+    Only orders matching order_filter are requested. With raw_store the full
+    order JSON, including customer details, is also kept for reconcile.py.
+    Extra keyword options (archive, replay, ...) are passed to run_pipeline.
+    """
     site_url = config['SITE_URL']
     domain = config.get('DOMAIN', 'unknown')
-    csv_file = f"data/order_data_{website_name}.csv"
     
     print(f"\n🔄 Starting to fetch order data from {site_url}")
     print(f"📊 Website: {domain}")
     
-    current_page = get_current_page(website_name)
-    total_orders = 0
+    sinks = order_sinks(website_name, raw_store)
+    checkpoint = Checkpoint(f"data/current_page_{website_name}.txt")
+    total_orders = run_pipeline(config, 'orders', lambda order: order, sinks, checkpoint, 'orders',
+                                params=order_filter.rest_params() if order_filter else None, **options)
 
-    while True:
-        print(f"📥 Fetching page {current_page}...", end=' ', flush=True)
-        orders, has_more = fetch_orders(current_page, config)
-        
-        if not orders:
-            if current_page == 1:
-                print("❌ No orders found or error occurred.")
-                break
-            print("✓ No more orders to fetch.")
-            break
+    print(f"\n✅ Finished! Total orders processed: {total_orders}")
+    for sink in sinks:
+        print(f"📁 Results saved to {sink.path}")
 
-        total_orders += len(orders)
-        write_orders_to_csv(orders, csv_file, website_name)
-        save_current_page(current_page, website_name)
+def probe_orders(session, config, params):
+    """
+    Request a single order to learn the collection size.
 
-        if not has_more:
-            print("✓ Reached the last page.")
-            break
+    Returns:
+        tuple: (X-WP-Total, the first order or None)
+    """
+    response = session.get(f"{config['SITE_URL']}/wp-json/wc/v3/orders", params=page_query(config, 1, 1, params))
+    response.raise_for_status()
+    items = response.json()
+    return int(response.headers.get('X-WP-Total', len(items))), items[0] if items else None
 
-        current_page += 1
-        time.sleep(1)  # Add delay to avoid hitting API rate limits
+def plan_windows(session, config, order_filter, after, before, window_orders):
+    """
+    Split [after, before) of a filtered order set into date windows holding at most window_orders orders each.
 
-    print(f"\n✅ Finished! Total orders processed: {total_orders}")
-    print(f"📁 Results saved to {csv_file}")
+    Windows are sized from X-WP-Total: a range is cut into as many equal spans as
+    its count requires, and any span that is still too dense is split again.
 
-def get_website_config(website_name=None):
-    """Get configuration for a website"""
-    # Try to load from config.json first
-    try:
-        with open('config.json', 'r') as f:
-            config_data = json.load(f)
-        
-        websites = config_data.get('websites', {})
-        default_website = config_data.get('default_website')
-        
-        if website_name and website_name in websites:
-            return websites[website_name]
-        elif default_website and default_website in websites:
-            return websites[default_website]
-        elif websites:
-            # Return first available website
-            return list(websites.values())[0]
-    except (FileNotFoundError, json.JSONDecodeError, KeyError):
-        pass
-    
-    # Fallback to environment variables
-    return {
-        'CONSUMER_KEY': os.getenv('CONSUMER_KEY'),
-        'CONSUMER_SECRET': os.getenv('CONSUMER_SECRET'),
-        'SITE_URL': os.getenv('SITE_URL'),
-        'DOMAIN': os.getenv('DOMAIN_1')
-    }
+    Returns:
+        list: (after, before, order count) tuples in chronological order, empty windows dropped
+    """
+    total, _ = probe_orders(session, config, order_filter.between(after, before).rest_params())
+    pieces = -(-total // window_orders)
+    if pieces <= 1 or before - after <= timedelta(seconds=pieces):
+        return [(after, before, total)] if total else []
+    step = (before - after) / pieces
+    bounds = [after + step * i for i in range(pieces)] + [before]
+    windows = []
+    for start, end in zip(bounds, bounds[1:]):
+        windows += plan_windows(session, config, order_filter, start.replace(microsecond=0), end.replace(microsecond=0), window_orders)
+    return windows
 
-def list_available_websites():
-    """List available websites from config.json or environment variables"""
-    websites = []
-    
-    # Try to load from config.json first
-    try:
-        with open('config.json', 'r') as f:
-            config_data = json.load(f)
-        websites = list(config_data.get('websites', {}).keys())
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Fallback to environment variables
-        if os.getenv('CONSUMER_KEY'):
-            websites.append('default')
-    
-    return websites
+def fetch_window(config, order_filter, window, per_page=DEFAULT_PER_PAGE, delay=1.0, cache=None, decoder=None):
+    """
+    Fetch every page of one date window on its own session, in ascending ID order.
 
-def select_website_interactive():
-    """Interactive website selection"""
-    websites = list_available_websites()
-    
-    if not websites:
-        print("No websites found in configuration.")
-        return None, None
-    
-    print("\nAvailable websites:")
-    print("-" * 40)
-    
-    for i, website in enumerate(websites, 1):
-        config = get_website_config(website if website != 'default' else None)
-        site_url = config.get('SITE_URL', 'Unknown URL')
-        domain = config.get('DOMAIN', 'Unknown Domain')
-        print(f"{i}. {website}")
-        print(f"   URL: {site_url}")
-        print(f"   Domain: {domain}")
-        print()
-    
-    while True:
-        try:
-            choice = input(f"Select website (1-{len(websites)}) or press Enter for default: ").strip()
-            
-            if not choice:
-                selected = websites[0]
-                print(f"Using default website: {selected}")
+    Raises:
+        FetchError: If a page still fails after retrying
+    """
+    after, before, _ = window
+    params = {**STABLE_ORDER, **order_filter.between(after, before).rest_params()}
+    records, page = [], 1
+    with requests.Session() as session:
+        while True:
+            items = with_retries(lambda: fetch_page(session, config, 'orders', page, per_page, params, cache, decoder),
+                                 f"page {page} of window {after:%Y-%m-%d %H:%M}")
+            if not items:
                 break
-            
-            choice_num = int(choice)
-            if 1 <= choice_num <= len(websites):
-                selected = websites[choice_num - 1]
-                print(f"Selected website: {selected}")
+            records += extract_records(items, to_plain)
+            if len(items) < per_page:
                 break
+            page += 1
+            time.sleep(delay)
+    metrics.add('windows_done')
+    print(f"✓ Window {after:%Y-%m-%d %H:%M} to {before:%Y-%m-%d %H:%M}: {len(records)} orders")
+    return records
+
+def fetch_woocommerce_orders_windowed(config, website_name="default", order_filter=None, workers=4,
+                                      window_orders=500, cache=None, decoder=None, plan=False, raw_store=False, delay=1.0):
+    """
+    Fetch orders as date windows in parallel so no window pages deep into the collection.
+
+    Windows are written newest first as they complete, with at most workers + 1
+    windows held in memory. Outputs go to temporary files that replace the old
+    exports only once every window was fetched; a failed window fails the run.
+
+    Args:
+        config (dict): Website configuration
+        website_name (str): Website name used in file names
+        order_filter (OrderFilter, optional): Orders to fetch; windows stay inside its dates
+        workers (int): Windows fetched concurrently
+        window_orders (int): Largest number of orders per window
+        cache (HttpCache, optional): Conditional request cache
+        decoder (JsonDecoder, optional): Page decoder
+        plan (bool): Only print the export plan for this many workers and exit
+        raw_store (bool): Also write the raw order JSON for reconcile.py
+        delay (float): Pause between the pages of a window
+    """
+    order_filter = order_filter or OrderFilter()
+    if plan:
+        plan_export(config, 'orders', 'orders', params=order_filter.rest_params(), delay=delay, concurrency=workers,
+                    gap_fill=False)
+    print(f"\n🔄 Starting to fetch order data from {config['SITE_URL']} in date windows")
+
+    with requests.Session() as session:
+        params = order_filter.rest_params()
+        _, oldest = probe_orders(session, config, {**params, 'order': 'asc', 'orderby': 'date'})
+        _, newest = probe_orders(session, config, {**params, 'order': 'desc', 'orderby': 'date'})
+        if not oldest:
+            print("❌ No orders found.")
+            return
+        after = datetime.strptime(oldest['date_created'], API_DATE_FORMAT)
+        before = datetime.strptime(newest['date_created'], API_DATE_FORMAT) + timedelta(seconds=1)
+        windows = plan_windows(session, config, order_filter, after, before, window_orders)
+    print(f"📊 {sum(window[2] for window in windows)} orders in {len(windows)} windows, {workers} workers")
+
+    sinks = order_sinks(website_name, raw_store)
+    paths = [sink.path for sink in sinks]
+    for sink in sinks:
+        sink.path = f"{sink.path}.tmp"
+        sink.open(resume=False)
+    seen, total, pending, complete = SeenIds(), 0, deque(), False
+
+    def write_next():
+        nonlocal total
+        # Windows are in ID order; reverse to write newest first, skipping repeats
+        records = [record for record in reversed(pending.popleft().result()) if seen.add(record['id'])]
+        for sink in sinks:
+            sink.write(records)
+        total += len(records)
+        metrics.add('records', len(records))
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for window in reversed(windows):
+            pending.append(executor.submit(fetch_window, config, order_filter, window, delay=delay, cache=cache, decoder=decoder))
+            if len(pending) > workers:
+                write_next()
+        while pending:
+            write_next()
+        complete = True
+    finally:
+        executor.shutdown(cancel_futures=True)
+        for sink in sinks:
+            sink.close()
+        if cache:
+            cache.close()
+        for sink, path in zip(sinks, paths):
+            if complete:
+                os.replace(sink.path, path)
             else:
-                print(f"Please enter a number between 1 and {len(websites)}")
-        
-        except ValueError:
-            print("Please enter a valid number")
-        except KeyboardInterrupt:
-            print("\nOperation cancelled")
-            sys.exit(0)
-    
-    # Get configuration for selected website
-    config = get_website_config(selected if selected != 'default' else None)
-    return selected, config
+                os.remove(sink.path)
+            sink.path = path
+
+    print(f"\n✅ Finished! Total orders processed: {total}")
+    for sink in sinks:
+        print(f"📁 Results saved to {sink.path}")
 
 def validate_config(config, required_keys):
     """Validate configuration has required keys"""
@@ -249,11 +226,27 @@ def main():
     parser.add_argument('--website', type=str, help='Website name (from config.json)')
     parser.add_argument('--interactive', action='store_true', help='Interactive website selection')
     parser.add_argument('--list', action='store_true', help='List available websites')
+    parser.add_argument('--windows', type=int, metavar='WORKERS',
+                        help='Fetch date windows in parallel with this many workers instead of paging linearly')
+    parser.add_argument('--window-orders', type=int, default=500,
+                        help='Largest number of orders per date window (default: 500)')
+    parser.add_argument('--raw-store', action='store_true',
+                        help='Also keep the raw order JSON in data/orders_raw_<website>.jsonl for reconcile.py')
+    add_filter_arguments(parser)
+    add_pipeline_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    if args.windows is not None and args.windows < 1:
+        parser.error("--windows must be at least 1")
+    if args.window_orders < 1:
+        parser.error("--window-orders must be at least 1")
+    if args.windows and (args.archive or args.replay or args.stream or args.no_gap_fill or args.queue_depth != 2):
+        parser.error("--windows cannot be combined with --archive, --replay, --stream, --queue-depth or --no-gap-fill")
     
     if args.list:
-        websites = list_available_websites()
+        websites = list_websites()
         if websites:
             print("Available websites:")
             for website in websites:
@@ -278,18 +271,28 @@ def main():
         sys.exit(1)
     
     # Validate configuration
-    required_keys = ['CONSUMER_KEY', 'CONSUMER_SECRET', 'SITE_URL']
-    if not validate_config(config, required_keys):
+    if not validate_config(config, REST_REQUIRED_KEYS):
         print("❌ Invalid configuration")
         sys.exit(1)
     
+    metrics.configure('fetch_orders_api', website_name, args.metrics, args.metrics_file, args.metrics_interval)
     print('🚀 Starting order data import...\n')
     try:
-        fetch_woocommerce_orders(config, website_name)
+        with profiled('fetch_orders_api', args):
+            options = pipeline_options(args, website_name, 'orders')
+            order_filter = OrderFilter.from_args(args)
+            if args.windows:
+                fetch_woocommerce_orders_windowed(config, website_name, order_filter, args.windows, args.window_orders,
+                                                  options['cache'], options['decoder'], options['plan'], args.raw_store,
+                                                  options['delay'])
+            else:
+                fetch_woocommerce_orders(config, website_name, order_filter, args.raw_store, **options)
     except KeyboardInterrupt:
         print("\n⚠️ Process interrupted by user. Progress has been saved.")
     except Exception as e:
         print(f"❌ An unexpected error occurred: {e}")
+    finally:
+        metrics.finish()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,118 +4,281 @@ Script to fetch WooCommerce orders data from MySQL database.
 """
 
 import os
+import re
 import sys
 import csv
 import json
 import mysql.connector
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
 import argparse
+import heapq
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from run_metrics import metrics, add_metrics_arguments
+from profiling import profiled, add_profile_arguments
+from db_connection import get_pooled_connection, close_pools, decode_row
+from order_filters import OrderFilter, add_filter_arguments
 
 # Load environment variables
 load_dotenv()
 
-def get_db_connection(website_config):
+# Meta keys pivoted into order and line item columns, as (column, meta_key)
+ORDER_META = (
+    ('billing_first_name', '_billing_first_name'),
+    ('billing_last_name', '_billing_last_name'),
+    ('billing_email', '_billing_email'),
+    ('billing_phone', '_billing_phone'),
+    ('order_total', '_order_total'),
+    ('payment_method', '_payment_method_title')
+)
+ITEM_META = (
+    ('product_id', '_product_id'),
+    ('variation_id', '_variation_id'),
+    ('quantity', '_qty'),
+    ('line_total', '_line_total')
+)
+# One pooled connection per partition plus the coordinating one, within the connector's 32-connection pool limit
+MAX_PARTITIONS = 31
+META_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def meta_columns(keys, taken=()):
+    """
+    (column, meta_key) pairs for extra meta keys, named after the key without its leading underscore.
+
+    Raises:
+        ValueError: If a key is invalid or its column clashes with a taken column or another key's
+    """
+    columns = {column.lower() for column in taken}
+    pairs = []
+    for key in keys:
+        column = key.lstrip('_').replace('-', '_')
+        if not META_KEY_PATTERN.match(key) or not column:
+            raise ValueError(f"Invalid meta key: {key}")
+        if column.lower() in columns:
+            raise ValueError(f"Meta key {key} clashes with the existing column {column}")
+        columns.add(column.lower())
+        pairs.append((column, key))
+    return tuple(pairs)
+
+def pivot_sql(alias, meta):
+    """Pivot columns and the meta_key IN (...) list for a set of (column, meta_key) pairs."""
+    columns = ''.join(f",\n        MAX(CASE WHEN {alias}.meta_key = '{key}' THEN {alias}.meta_value END) as `{column}`"
+                      for column, key in meta)
+    return columns, ', '.join(f"'{key}'" for _, key in meta)
+
+@lru_cache(maxsize=None)
+def build_orders_query(meta=ORDER_META, stats=False):
+    """
+    Order pivot query joining only the wanted meta keys, so the (post_id, meta_key) index applies.
+    
+    With stats, order_total is read from wc_order_stats instead of being pivoted from postmeta.
+    """
+    stats_column = stats_join = ''
+    if stats:
+        meta = tuple((column, key) for column, key in meta if key != '_order_total')
+        stats_column = ",\n        MAX(s.total_sales) as order_total"
+        stats_join = "\n    LEFT JOIN \n        {table_prefix}wc_order_stats s ON s.order_id = p.ID"
+    columns, keys = pivot_sql('pm', meta)
+    return f"""
+    SELECT 
+        p.ID as order_id,
+        p.post_date as order_date,
+        p.post_status as order_status{columns}{stats_column}
+    FROM 
+        {{table_prefix}}posts p
+    LEFT JOIN 
+        {{table_prefix}}postmeta pm ON p.ID = pm.post_id AND pm.meta_key IN ({keys}){stats_join}
+    WHERE 
+        p.post_type = 'shop_order'
+        {{filters}}
+    GROUP BY 
+        p.ID
+    ORDER BY 
+        p.post_date DESC
+    """
+
+@lru_cache(maxsize=None)
+def build_order_items_query(meta=ITEM_META):
+    """Line item pivot query for a single order, joining only the wanted item meta keys."""
+    columns, keys = pivot_sql('oim', meta)
+    return f"""
+    SELECT 
+        oi.order_item_id,
+        oi.order_item_name as product_name{columns}
+    FROM 
+        {{table_prefix}}woocommerce_order_items oi
+    LEFT JOIN 
+        {{table_prefix}}woocommerce_order_itemmeta oim ON oi.order_item_id = oim.order_item_id AND oim.meta_key IN ({keys})
+    WHERE 
+        oi.order_id = %s
+        AND oi.order_item_type = 'line_item'
+    GROUP BY 
+        oi.order_item_id
+    """
+
+# Default queries, shared with index_advisor.py
+ORDERS_QUERY = build_orders_query()
+ORDER_ITEMS_QUERY = build_order_items_query()
+
+# Line items for all orders in scope from WooCommerce Analytics' flat lookup table, in one query
+LOOKUP_ITEMS_QUERY = """
+    SELECT 
+        l.order_id,
+        l.order_item_id,
+        oi.order_item_name as product_name,
+        l.product_id,
+        l.variation_id,
+        l.product_qty as quantity,
+        l.product_net_revenue as line_total
+    FROM 
+        {table_prefix}posts p
+    JOIN 
+        {table_prefix}wc_order_product_lookup l ON l.order_id = p.ID
+    JOIN 
+        {table_prefix}woocommerce_order_items oi ON oi.order_item_id = l.order_item_id
+    WHERE 
+        p.post_type = 'shop_order'
+        {filters}
+    ORDER BY 
+        l.order_id, l.order_item_id
+    """
+
+def get_db_connection(website_config, pool_size=None):
     """
-    Create a database connection based on website config.
+    Get a pooled database connection based on website config.
     
     Args:
         website_config (dict): Website configuration from config.json
+        pool_size (int, optional): Minimum pool size, e.g. the number of parallel workers
         
     Returns:
         mysql.connector.connection: Database connection object
     """
     try:
-        # Get database credentials from website config
-        db_host = website_config['DATABASE_IP']
         db_name = website_config['DATABASE_NAME']
-        db_user = website_config['DATABASE_USER']
-        db_password = website_config['DATABASE_PASSWORD']
+        print(f"Connecting to database: {db_name} at {website_config['DATABASE_IP']} with user {website_config['DATABASE_USER']}")
         
-        print(f"Connecting to database: {db_name} at {db_host} with user {db_user}")
-        
-        # Connect to the database
-        connection = mysql.connector.connect(
-            host=db_host,
-            database=db_name,
-            user=db_user,
-            password=db_password
-        )
-        
-        if connection.is_connected():
-            print(f"Connected to MySQL database: {db_name}")
-            return connection
+        # Borrow a health checked connection from the website's pool
+        connection = get_pooled_connection(website_config, pool_size)
+        print(f"Connected to MySQL database: {db_name}")
+        return connection
             
     except mysql.connector.Error as e:
         print(f"Error connecting to MySQL database: {e}")
         sys.exit(1)
 
-def fetch_woocommerce_orders(connection, table_prefix, days=None, start_date=None, end_date=None):
+def order_scope(table_prefix, order_filter=None, id_range=None):
+    """
+    SQL condition on shop_order posts p for a filter and an optional ID partition.
+    
+    Returns:
+        tuple: (condition starting with AND, or empty; parameter list)
+    """
+    filters, params = (order_filter or OrderFilter()).sql(table_prefix)
+    if id_range:
+        filters += " AND p.ID BETWEEN %s AND %s"
+        params.extend(id_range)
+    return filters, params
+
+def lookup_tables_usable(connection, table_prefix, item_meta=ITEM_META, order_filter=None, id_range=None):
+    """
+    Check whether wc_order_stats and wc_order_product_lookup can replace the meta pivots.
+    
+    They are used for the default line item columns only, when both tables exist
+    and every order and line item in scope already has a row in them.
+    
+    Args:
+        connection: MySQL database connection
+        table_prefix (str): WordPress table prefix
+        item_meta (tuple): (column, meta_key) pairs requested for line items
+        order_filter (OrderFilter, optional): Status, customer and date restrictions
+        id_range (tuple, optional): Inclusive (first_id, last_id) order ID range
+        
+    Returns:
+        bool: True if line items and totals can be read from the lookup tables
+    """
+    if item_meta != ITEM_META:
+        print("Extra line item meta requested; pivoting order item meta.")
+        return False
+    filters, params = order_scope(table_prefix, order_filter, id_range)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() "
+                       "AND table_name IN (%s, %s)", (f"{table_prefix}wc_order_stats", f"{table_prefix}wc_order_product_lookup"))
+        if cursor.fetchone()[0] < 2:
+            print("WooCommerce lookup tables not found; pivoting order item meta.")
+            return False
+        # Orders or line items the analytics import has not reached yet
+        cursor.execute(f"""
+            SELECT
+                (SELECT COUNT(*) FROM {table_prefix}posts p
+                 LEFT JOIN {table_prefix}wc_order_stats s ON s.order_id = p.ID
+                 WHERE p.post_type = 'shop_order' AND s.order_id IS NULL {filters}) +
+                (SELECT COUNT(*) FROM {table_prefix}posts p
+                 JOIN {table_prefix}woocommerce_order_items oi ON oi.order_id = p.ID AND oi.order_item_type = 'line_item'
+                 LEFT JOIN {table_prefix}wc_order_product_lookup l ON l.order_item_id = oi.order_item_id
+                 WHERE p.post_type = 'shop_order' AND l.order_item_id IS NULL {filters})""", params + params)
+        missing = cursor.fetchone()[0]
+    except mysql.connector.Error as e:
+        print(f"Error checking WooCommerce lookup tables: {e}")
+        return False
+    finally:
+        cursor.close()
+    if missing:
+        print(f"WooCommerce lookup tables are missing {missing} orders or line items; pivoting order item meta.")
+        return False
+    print("Using WooCommerce lookup tables for line items and order totals.")
+    return True
+
+def fetch_woocommerce_orders(connection, table_prefix, order_filter=None, id_range=None,
+                             order_meta=ORDER_META, item_meta=ITEM_META, use_lookup=None):
     """
     Fetch WooCommerce orders from the database.
     
     Args:
         connection: MySQL database connection
         table_prefix (str): WordPress table prefix
-        days (int, optional): Number of days to look back for orders
-        start_date (str, optional): Start date for order range (YYYY-MM-DD)
-        end_date (str, optional): End date for order range (YYYY-MM-DD)
+        order_filter (OrderFilter, optional): Status, customer and date restrictions
+        id_range (tuple, optional): Inclusive (first_id, last_id) order ID range
+        order_meta (tuple): (column, meta_key) pairs pivoted into order columns
+        item_meta (tuple): (column, meta_key) pairs pivoted into line item columns
+        use_lookup (bool, optional): Read line items and totals from the lookup tables; None detects it
         
     Returns:
-        list: List of dictionaries containing order data
+        list: List of dictionaries containing order data, or None if a query failed
     """
-    cursor = connection.cursor(dictionary=True)
-    
-    # Build the date filter part of the query
-    date_filter = ""
-    if days:
-        date_filter = f"AND p.post_date >= DATE_SUB(NOW(), INTERVAL {days} DAY)"
-    elif start_date and end_date:
-        date_filter = f"AND p.post_date BETWEEN '{start_date}' AND '{end_date}'"
-    elif start_date:
-        date_filter = f"AND p.post_date >= '{start_date}'"
-    elif end_date:
-        date_filter = f"AND p.post_date <= '{end_date}'"
+    if use_lookup is None:
+        use_lookup = lookup_tables_usable(connection, table_prefix, item_meta, order_filter, id_range)
+    cursor = connection.cursor(prepared=True, dictionary=True)
+    
+    # Build the filter part of the query as bound parameters, restricted to one ID partition if given
+    filters, params = order_scope(table_prefix, order_filter, id_range)
     
     # SQL query to fetch WooCommerce orders
-    query = f"""
-    SELECT 
-        p.ID as order_id,
-        p.post_date as order_date,
-        p.post_status as order_status,
-        MAX(CASE WHEN pm.meta_key = '_billing_first_name' THEN pm.meta_value END) as billing_first_name,
-        MAX(CASE WHEN pm.meta_key = '_billing_last_name' THEN pm.meta_value END) as billing_last_name,
-        MAX(CASE WHEN pm.meta_key = '_billing_email' THEN pm.meta_value END) as billing_email,
-        MAX(CASE WHEN pm.meta_key = '_billing_phone' THEN pm.meta_value END) as billing_phone,
-        MAX(CASE WHEN pm.meta_key = '_order_total' THEN pm.meta_value END) as order_total,
-        MAX(CASE WHEN pm.meta_key = '_payment_method_title' THEN pm.meta_value END) as payment_method
-    FROM 
-        {table_prefix}posts p
-    JOIN 
-        {table_prefix}postmeta pm ON p.ID = pm.post_id
-    WHERE 
-        p.post_type = 'shop_order'
-        {date_filter}
-    GROUP BY 
-        p.ID
-    ORDER BY 
-        p.post_date DESC
-    """
+    query = build_orders_query(order_meta, use_lookup).format(table_prefix=table_prefix, filters=filters)
     
     try:
-        cursor.execute(query)
-        orders = cursor.fetchall()
+        with metrics.phase('orders_query'):
+            cursor.execute(query, params)
+            orders = [decode_row(row) for row in cursor.fetchall()]
+        metrics.add('records', len(orders))
         
         if not orders:
             print("No orders found for the specified criteria.")
             cursor.close()
             return []
             
-        # Fetch order items for each order
-        for order in orders:
-            order_id = order['order_id']
-            order['products'] = fetch_order_items(connection, table_prefix, order_id)
-            
+        if use_lookup:
+            fetch_lookup_items(cursor, table_prefix, orders, filters, params)
+        else:
+            # Fetch order items for each order, reusing one prepared statement
+            items_cursor = connection.cursor(prepared=True, dictionary=True)
+            for order in orders:
+                order_id = order['order_id']
+                order['products'] = fetch_order_items(connection, table_prefix, order_id, items_cursor, item_meta)
+            items_cursor.close()
         cursor.close()
         print(f"Successfully fetched {len(orders)} orders with their products.")
         return orders
@@ -123,9 +286,32 @@ def fetch_woocommerce_orders(connection, table_prefix, days=None, start_date=Non
     except mysql.connector.Error as e:
         print(f"Error fetching orders: {e}")
         cursor.close()
-        return []
+        return None
+
+def fetch_lookup_items(cursor, table_prefix, orders, filters, params):
+    """
+    Attach line items to orders from wc_order_product_lookup with a single query.
+    
+    Args:
+        cursor: Prepared dictionary cursor
+        table_prefix (str): WordPress table prefix
+        orders (list): Orders fetched with the same filters
+        filters (str): SQL condition on shop_order posts p
+        params (list): Parameters bound to the filters
+    """
+    by_id = {order['order_id']: order for order in orders}
+    for order in orders:
+        order['products'] = []
+    with metrics.phase('items_query'):
+        cursor.execute(LOOKUP_ITEMS_QUERY.format(table_prefix=table_prefix, filters=filters), params)
+        items = [decode_row(row) for row in cursor.fetchall()]
+    for item in items:
+        order = by_id.get(item.pop('order_id'))
+        if order:
+            order['products'].append(item)
+    metrics.add('line_items', len(items))
 
-def fetch_order_items(connection, table_prefix, order_id):
+def fetch_order_items(connection, table_prefix, order_id, cursor=None, item_meta=ITEM_META):
     """
     Fetch line items (products) for a specific order.
     
@@ -133,50 +319,208 @@ def fetch_order_items(connection, table_prefix, order_id):
         connection: MySQL database connection
         table_prefix (str): WordPress table prefix
         order_id (int): Order ID to fetch items for
+        cursor (optional): Prepared cursor reused across calls so the statement is parsed once
+        item_meta (tuple): (column, meta_key) pairs pivoted into line item columns
         
     Returns:
         list: List of dictionaries containing order item data
     """
-    cursor = connection.cursor(dictionary=True)
+    own_cursor = cursor is None
+    if own_cursor:
+        cursor = connection.cursor(prepared=True, dictionary=True)
     
     # Query to get order items
-    query = f"""
-    SELECT 
-        oi.order_item_id,
-        oi.order_item_name as product_name,
-        MAX(CASE WHEN oim.meta_key = '_product_id' THEN oim.meta_value END) as product_id,
-        MAX(CASE WHEN oim.meta_key = '_variation_id' THEN oim.meta_value END) as variation_id,
-        MAX(CASE WHEN oim.meta_key = '_qty' THEN oim.meta_value END) as quantity,
-        MAX(CASE WHEN oim.meta_key = '_line_total' THEN oim.meta_value END) as line_total,
-        MAX(CASE WHEN oim.meta_key = '_line_subtotal' THEN oim.meta_value END) as line_subtotal
-    FROM 
-        {table_prefix}woocommerce_order_items oi
-    JOIN 
-        {table_prefix}woocommerce_order_itemmeta oim ON oi.order_item_id = oim.order_item_id
-    WHERE 
-        oi.order_id = {order_id}
-        AND oi.order_item_type = 'line_item'
-    GROUP BY 
-        oi.order_item_id
-    """
+    query = build_order_items_query(item_meta).format(table_prefix=table_prefix)
     
     try:
-        cursor.execute(query)
-        items = cursor.fetchall()
-        cursor.close()
+        with metrics.phase('items_query'):
+            cursor.execute(query, (order_id,))
+            items = [decode_row(row) for row in cursor.fetchall()]
+        metrics.add('line_items', len(items))
         return items
     except mysql.connector.Error as e:
         print(f"Error fetching order items for order {order_id}: {e}")
-        cursor.close()
         return []
+    finally:
+        if own_cursor:
+            cursor.close()
+
+def plan_orders_export(connection, table_prefix, order_filter=None, partitions=1, samples=5,
+                       order_meta=ORDER_META, item_meta=ITEM_META, use_lookup=None):
+    """
+    Print the expected queries, rows, bytes and wall time of an order export.
+    
+    COUNT queries size the export and the time of the order scan stands in for
+    the pivot query; a few line item queries sample the per-order cost.
+    
+    Args:
+        connection: MySQL database connection
+        table_prefix (str): WordPress table prefix
+        order_filter (OrderFilter, optional): Status, customer and date restrictions
+        partitions (int): Number of parallel ID partitions
+        samples (int): Number of orders whose line item query is timed
+        order_meta (tuple): (column, meta_key) pairs pivoted into order columns
+        item_meta (tuple): (column, meta_key) pairs pivoted into line item columns
+        use_lookup (bool, optional): Plan for line items from the lookup tables; None detects it
+    """
+    if use_lookup is None:
+        use_lookup = lookup_tables_usable(connection, table_prefix, item_meta, order_filter)
+    filters, params = (order_filter or OrderFilter()).sql(table_prefix)
+    cursor = connection.cursor()
+    
+    started = time.perf_counter()
+    cursor.execute(f"""
+        SELECT COUNT(DISTINCT p.ID), COALESCE(SUM(LENGTH(pm.meta_key) + LENGTH(pm.meta_value)), 0)
+        FROM {table_prefix}posts p
+        LEFT JOIN {table_prefix}postmeta pm ON p.ID = pm.post_id AND pm.meta_key IN ({pivot_sql('pm', order_meta)[1]})
+        WHERE p.post_type = 'shop_order' {filters}""", params)
+    orders, order_bytes = cursor.fetchone()
+    scan_seconds = time.perf_counter() - started
+    
+    cursor.execute(f"""
+        SELECT COUNT(DISTINCT oi.order_item_id), COALESCE(SUM(LENGTH(oim.meta_key) + LENGTH(oim.meta_value)), 0)
+        FROM {table_prefix}posts p
+        JOIN {table_prefix}woocommerce_order_items oi ON oi.order_id = p.ID AND oi.order_item_type = 'line_item'
+        LEFT JOIN {table_prefix}woocommerce_order_itemmeta oim
+            ON oim.order_item_id = oi.order_item_id AND oim.meta_key IN ({pivot_sql('oim', item_meta)[1]})
+        WHERE p.post_type = 'shop_order' {filters}""", params)
+    items, item_bytes = cursor.fetchone()
+    
+    cursor.execute(f"SELECT p.ID FROM {table_prefix}posts p WHERE p.post_type = 'shop_order' {filters} "
+                   f"ORDER BY p.ID DESC LIMIT {0 if use_lookup else int(samples)}", params)
+    sample_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    
+    items_cursor = connection.cursor(prepared=True, dictionary=True)
+    started = time.perf_counter()
+    for order_id in sample_ids:
+        fetch_order_items(connection, table_prefix, order_id, items_cursor, item_meta)
+    item_seconds = (time.perf_counter() - started) / max(1, len(sample_ids))
+    items_cursor.close()
+    
+    # The lookup path replaces the per-order queries with one line item scan per partition
+    queries = partitions * (2 if use_lookup else 1) + (0 if use_lookup else orders) + (1 if partitions > 1 else 0)
+    eta = (2 * scan_seconds if use_lookup else scan_seconds + orders * item_seconds) / partitions
+    print(f"\nExport plan ({partitions} partition{'s' if partitions > 1 else ''}):")
+    print(f"  Orders: {orders}")
+    print(f"  Line items: {items}")
+    print(f"  Queries: {queries}")
+    print(f"  Transfer: ~{(order_bytes + item_bytes) / 1048576:.1f} MB of meta values")
+    print(f"  Latency: {scan_seconds * 1000:.0f} ms order scan, "
+          + ("one lookup table scan for line items" if use_lookup else f"{item_seconds * 1000:.1f} ms per line item query"))
+    print(f"  ETA: {timedelta(seconds=round(eta))}")
+
+def get_order_id_range(connection, table_prefix):
+    """
+    Get the lowest and highest shop_order IDs.
+    
+    Args:
+        connection: MySQL database connection
+        table_prefix (str): WordPress table prefix
+        
+    Returns:
+        tuple: (min_id, max_id), or (None, None) if there are no orders
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT MIN(ID), MAX(ID) FROM {table_prefix}posts WHERE post_type = 'shop_order'")
+    min_id, max_id = cursor.fetchone()
+    cursor.close()
+    return min_id, max_id
+
+def split_id_ranges(min_id, max_id, partitions):
+    """
+    Split an inclusive ID range into contiguous, roughly equal partitions.
+    
+    Args:
+        min_id (int): Lowest order ID
+        max_id (int): Highest order ID
+        partitions (int): Number of partitions
+        
+    Returns:
+        list: List of inclusive (first_id, last_id) tuples, highest IDs first
+    """
+    size = max(1, -(-(max_id - min_id + 1) // partitions))
+    ranges = [(start, min(start + size - 1, max_id)) for start in range(min_id, max_id + 1, size)]
+    return ranges[::-1]
+
+def fetch_orders_partition(website_config, table_prefix, id_range, partitions, order_filter=None, **meta):
+    """
+    Fetch one ID partition of orders on its own pooled connection.
+    
+    Args:
+        website_config (dict): Website configuration from config.json
+        table_prefix (str): WordPress table prefix
+        id_range (tuple): Inclusive (first_id, last_id) order ID range
+        partitions (int): Total number of partitions, used to size the pool
+        order_filter (OrderFilter, optional): Filter passed to fetch_woocommerce_orders
+        **meta: order_meta, item_meta and use_lookup passed to fetch_woocommerce_orders
+        
+    Returns:
+        list: List of dictionaries containing order data, or None if the partition failed
+    """
+    try:
+        connection = get_pooled_connection(website_config, partitions + 1)
+    except mysql.connector.Error as e:
+        print(f"Error connecting for orders {id_range[0]}-{id_range[1]}: {e}")
+        return None
+    try:
+        print(f"Fetching orders {id_range[0]}-{id_range[1]}...")
+        return fetch_woocommerce_orders(connection, table_prefix, order_filter, id_range, **meta)
+    finally:
+        connection.close()
+        metrics.add('partitions_done')
+
+def fetch_orders_partitioned(connection, website_config, table_prefix, partitions, order_filter=None, **meta):
+    """
+    Fetch orders by splitting the ID space into ranges fetched in parallel.
+    
+    Args:
+        connection: MySQL database connection used to find the ID range
+        website_config (dict): Website configuration from config.json
+        table_prefix (str): WordPress table prefix
+        partitions (int): Number of ID ranges and worker threads, at most MAX_PARTITIONS
+        order_filter (OrderFilter, optional): Filter passed to fetch_woocommerce_orders
+        **meta: order_meta, item_meta and use_lookup passed to fetch_woocommerce_orders
+        
+    Returns:
+        list: One list of orders per partition, highest IDs first, or None if any partition failed
+    """
+    min_id, max_id = get_order_id_range(connection, table_prefix)
+    if min_id is None:
+        print("No orders found for the specified criteria.")
+        return []
+    
+    # Detect the lookup tables once for the whole export rather than per partition
+    if meta.get('use_lookup') is None:
+        meta['use_lookup'] = lookup_tables_usable(connection, table_prefix, meta.get('item_meta', ITEM_META), order_filter)
+    ranges = split_id_ranges(min_id, max_id, min(partitions, MAX_PARTITIONS))
+    print(f"Fetching orders {min_id}-{max_id} in {len(ranges)} partitions...")
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        results = list(executor.map(
+            lambda id_range: fetch_orders_partition(website_config, table_prefix, id_range, len(ranges), order_filter, **meta),
+            ranges
+        ))
+    if any(part is None for part in results):
+        print("A partition failed; export aborted.")
+        return None
+    return results
 
-def export_to_csv(orders, filename=None):
+# CSV column order: one row per line item, order columns repeated
+ORDER_CSV_COLUMNS = ('order_id', 'order_date', 'order_status') + tuple(column for column, _ in ORDER_META)
+ITEM_CSV_COLUMNS = ('product_name',) + tuple(column for column, _ in ITEM_META)
+
+def export_to_csv(orders, filename=None, order_columns=ORDER_CSV_COLUMNS, item_columns=ITEM_CSV_COLUMNS):
     """
     Export orders data to CSV file.
     
+    Rows are streamed straight to the writer through one reused row buffer,
+    so no per-item dict copies or intermediate row list are built.
+    
     Args:
-        orders (list): List of dictionaries containing order data
+        orders (iterable): Dictionaries containing order data
         filename (str, optional): Output filename
+        order_columns (tuple): Order columns, in CSV order
+        item_columns (tuple): Line item columns, in CSV order
         
     Returns:
         str: Path to the saved CSV file
@@ -190,47 +534,29 @@ def export_to_csv(orders, filename=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"data/woocommerce_orders_{timestamp}.csv"
     
-    # Create a flattened list for CSV export
-    flattened_orders = []
-    for order in orders:
-        products = order.pop('products', [])
-        if not products:
-            # If no products, still include the order
-            flattened_order = order.copy()
-            flattened_order.update({
-                'product_name': '',
-                'product_id': '',
-                'variation_id': '',
-                'quantity': '',
-                'line_total': ''
-            })
-            flattened_orders.append(flattened_order)
-        else:
+    metrics.add('csv_files')
+    split = len(order_columns)
+    row = [''] * (split + len(item_columns))
+    no_item = ('',) * len(item_columns)
+    
+    with metrics.phase('csv_write'), open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(order_columns + item_columns)
+        for order in orders:
+            row[:split] = map(order.get, order_columns)
+            products = order.get('products')
+            if not products:
+                # If no products, still include the order
+                row[split:] = no_item
+                writer.writerow(row)
+                continue
             # Create a row for each product in the order
             for product in products:
-                flattened_order = order.copy()
-                flattened_order.update({
-                    'product_name': product.get('product_name', ''),
-                    'product_id': product.get('product_id', ''),
-                    'variation_id': product.get('variation_id', ''),
-                    'quantity': product.get('quantity', ''),
-                    'line_total': product.get('line_total', '')
-                })
-                flattened_orders.append(flattened_order)
-    
-    # Save to CSV
-    if flattened_orders:
-        with open(filename, 'w', newline='') as csvfile:
-            fieldnames = flattened_orders[0].keys()
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(flattened_orders)
-        
-        print(f"Orders data exported to {filename}")
-        return filename
-    else:
-        print("No data to export.")
-        return None
+                row[split:] = map(product.get, item_columns)
+                writer.writerow(row)
+    
+    print(f"Orders data exported to {filename}")
+    return filename
 
 def main():
     """Main function to run the script."""
@@ -262,40 +588,76 @@ def main():
     table_prefix = website_config['DATABASE_TABLE_PREFIX']
     
     parser = argparse.ArgumentParser(description='Fetch WooCommerce orders from MySQL database')
-    parser.add_argument('--days', type=int, help='Number of days to look back for orders')
-    parser.add_argument('--start', type=str, help='Start date (YYYY-MM-DD)')
-    parser.add_argument('--end', type=str, help='End date (YYYY-MM-DD)')
+    add_filter_arguments(parser)
     parser.add_argument('--output', type=str, help='Output CSV filename')
+    parser.add_argument('--partitions', type=int, default=1, help='Split the order ID space into N ranges fetched in parallel')
+    parser.add_argument('--partition-files', action='store_true', help='Write each partition to its own CSV file instead of merging')
+    parser.add_argument('--plan', action='store_true', help='Estimate queries, rows, transfer size and duration without exporting')
+    parser.add_argument('--order-meta', nargs='+', default=website_config.get('EXTRA_ORDER_META', []), metavar='KEY',
+                        help='Extra order meta keys to export as columns (default: EXTRA_ORDER_META in config.json)')
+    parser.add_argument('--item-meta', nargs='+', default=website_config.get('EXTRA_ITEM_META', []), metavar='KEY',
+                        help='Extra line item meta keys to export as columns (default: EXTRA_ITEM_META in config.json)')
+    parser.add_argument('--no-lookup', action='store_true', help='Always pivot order item meta instead of using the WooCommerce lookup tables')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    if not 1 <= args.partitions <= MAX_PARTITIONS:
+        args.partitions = min(max(args.partitions, 1), MAX_PARTITIONS)
+        print(f"Partitions must be between 1 and {MAX_PARTITIONS}; using {args.partitions}.")
+    try:
+        meta = {'order_meta': ORDER_META + meta_columns(args.order_meta, ORDER_CSV_COLUMNS + ('products',)),
+                'item_meta': ITEM_META + meta_columns(args.item_meta, ('order_id', 'order_item_id') + ITEM_CSV_COLUMNS),
+                'use_lookup': False if args.no_lookup else None}
+    except ValueError as e:
+        parser.error(str(e))
+    columns = {'order_columns': ORDER_CSV_COLUMNS[:3] + tuple(column for column, _ in meta['order_meta']),
+               'item_columns': ITEM_CSV_COLUMNS[:1] + tuple(column for column, _ in meta['item_meta'])}
+    metrics.configure('fetch_orders_database', selected_website, args.metrics, args.metrics_file, args.metrics_interval)
     
-    # Get database connection using selected website's config
-    connection = get_db_connection(website_config)
+    with profiled('fetch_orders_database', args):
+        # Get database connection using selected website's config
+        connection = get_db_connection(website_config, args.partitions + 1)
     
-    if not connection:
-        return
+        if not connection:
+            return
     
-    # Use the website's table prefix from config
+        # Use the website's table prefix from config
     
-    print(f"Using table prefix: {table_prefix}")
+        print(f"Using table prefix: {table_prefix}")
     
-    # Fetch orders
-    orders = fetch_woocommerce_orders(
-        connection, 
-        table_prefix,
-        days=args.days,
-        start_date=args.start,
-        end_date=args.end
-    )
+        order_filter = OrderFilter.from_args(args)
+    
+        if args.plan:
+            plan_orders_export(connection, table_prefix, order_filter, args.partitions, **meta)
+            orders = []
+        elif args.partitions > 1:
+            # Fetch ID ranges in parallel, each on its own pooled connection
+            partitions = fetch_orders_partitioned(connection, website_config, table_prefix, args.partitions, order_filter, **meta)
+            if partitions is None:
+                orders = []
+            elif args.partition_files:
+                base = args.output or f"data/woocommerce_orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+                root, ext = os.path.splitext(base)
+                for i, part in enumerate(partitions, 1):
+                    export_to_csv(part, f"{root}_part{i}{ext or '.csv'}", **columns)
+                orders = []
+            else:
+                # Each partition is sorted by date, so a merge keeps the overall order
+                orders = list(heapq.merge(*partitions, key=lambda o: o['order_date'], reverse=True))
+        else:
+            orders = fetch_woocommerce_orders(connection, table_prefix, order_filter, **meta)
     
-    # Export to CSV
-    if orders:
-        export_to_csv(orders, args.output)
+        # Export to CSV
+        if orders:
+            export_to_csv(orders, args.output, **columns)
     
-    # Close connection
-    if connection.is_connected():
+        # Return connection to the pool and close idle pooled connections
         connection.close()
+        close_pools()
         print("Database connection closed.")
+    metrics.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
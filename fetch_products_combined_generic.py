@@ -0,0 +1,65 @@
+import argparse
+from woo_pipeline import (load_configuration, Checkpoint, CsvSink, JsonlSink, run_pipeline,
+                          add_pipeline_arguments, pipeline_options)
+from run_metrics import metrics, add_metrics_arguments
+from profiling import profiled, add_profile_arguments
+from term_cache import api_term_cache, CACHE_TTL
+import fetch_product_data_main_generic as product_data
+import fetch_product_titles_main_generic as product_titles
+
+def product_data_row_from_item(product, terms=None):
+    """CSV row for the product data export, or None if the product is incomplete."""
+    data = product_data.extract_product_data(product, terms)
+    return product_data.product_data_row(data) if data else None
+
+def fetch_woocommerce_products_combined(config, website_name="default", raw=False, term_ttl=CACHE_TTL, **options):
+    """Fetch each product page once and write titles, product data and optionally raw JSONL.
+
+    Category paths come from the term cache, refreshed when older than term_ttl seconds.
+    Extra keyword options (archive, replay, ...) are passed to run_pipeline.
+    """
+    titles_file, _ = product_titles.get_file_paths(website_name)
+    data_file, _ = product_data.get_file_paths(website_name)
+    print(f"\n🔄 Starting to fetch products from {config['SITE_URL']}")
+    if website_name != "default":
+        print(f"📊 Website: {website_name}")
+
+    terms = api_term_cache(config, website_name, term_ttl, offline=bool(options.get('replay') or options.get('plan')))
+    sinks = [
+        CsvSink(titles_file, ['Product Title'], lambda product: [product.get("name")], 'titles'),
+        CsvSink(data_file, product_data.PRODUCT_DATA_HEADER, lambda product: product_data_row_from_item(product, terms), 'products')
+    ]
+    if raw:
+        sinks.append(JsonlSink(f"data/products_raw_{website_name}.jsonl", 'raw products'))
+
+    checkpoint = Checkpoint(f"data/products_combined_page_{website_name}.txt")
+    total_products = run_pipeline(config, 'products', lambda product: product, sinks, checkpoint, 'products', **options)
+
+    print(f"\n✅ Finished! Total products processed: {total_products}")
+    for sink in sinks:
+        print(f"📁 Results saved to {sink.path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fetch WooCommerce product titles and data in a single pass')
+    parser.add_argument('--website', type=str, help='Website name (from config.json)')
+    parser.add_argument('--raw', action='store_true', help='Also write the raw product JSON as JSONL')
+    parser.add_argument('--term-ttl', type=int, default=CACHE_TTL, help='Maximum age in seconds of the cached category tree (0 reloads)')
+    add_pipeline_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    metrics.configure('fetch_products_combined', args.website, args.metrics, args.metrics_file, args.metrics_interval)
+
+    print('🚀 Starting combined product import...\n')
+    try:
+        with profiled('fetch_products_combined', args):
+            config = load_configuration(args.website)
+            website_name = args.website or "default"
+            fetch_woocommerce_products_combined(config, website_name, args.raw, args.term_ttl, **pipeline_options(args, website_name, 'products'))
+    except KeyboardInterrupt:
+        print("\n⚠️ Process interrupted by user. Progress has been saved.")
+    except Exception as e:
+        print(f"❌ An unexpected error occurred: {e}")
+    finally:
+        metrics.finish()
@@ -44,6 +44,22 @@ if ! [[ "$num_products" =~ ^[0-9]+$ ]] || ((num_products < 1)); then
     exit 1
 fi
 
+# ------------------ Filters and Sorting ------------------
+read -p "In-stock products only? (y/N): " in_stock
+read -p "Minimum price (default: none): " min_price
+read -p "Maximum price (default: none): " max_price
+read -p "Sort by title, price, sku or sales (default: none): " sort_by
+for price in "$min_price" "$max_price"; do
+    if [[ -n "$price" && ! "$price" =~ ^[0-9]+(\.[0-9]+)?$ ]]; then
+        echo "Invalid price"
+        exit 1
+    fi
+done
+if ! [[ "$sort_by" =~ ^(title|price|sku|sales)?$ ]]; then
+    echo "Invalid sort column"
+    exit 1
+fi
+
 # ------------------ Load DB Config ------------------
 DB_HOST=$(jq -r ".websites.\"$WEBSITE\".DATABASE_IP" "$CONFIG_FILE")
 DB_NAME=$(jq -r ".websites.\"$WEBSITE\".DATABASE_NAME" "$CONFIG_FILE")
@@ -57,41 +73,80 @@ if [[ -z "$DB_HOST" || -z "$DB_NAME" || -z "$DB_USER" || -z "$DB_PASS" || -z "$T
     exit 1
 fi
 
+mysql_query() {
+    mysql -h "$DB_HOST" -u "$DB_USER" -p"$DB_PASS" "$DB_NAME" -N -e "$1"
+}
+
+# ------------------ Price, Stock and SKU Source ------------------
+# wc_product_meta_lookup has indexed price, stock, SKU and sales columns; use postmeta when it is missing or incomplete
+LOOKUP="${TABLE_PREFIX}wc_product_meta_lookup"
+if [[ $(mysql_query "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = '$LOOKUP'") == 1 ]] &&
+   [[ $(mysql_query "SELECT COUNT(*) FROM ${TABLE_PREFIX}posts p LEFT JOIN $LOOKUP l ON l.product_id = p.ID
+                     WHERE p.post_type = 'product' AND p.post_status = 'publish' AND l.product_id IS NULL") == 0 ]]; then
+    echo "Using $LOOKUP for price, stock and SKU"
+    META_JOINS="LEFT JOIN $LOOKUP l ON l.product_id = p.ID"
+    PRICE="ROUND(l.min_price, 2)"; MIN_PRICE="l.min_price"; MAX_PRICE="l.max_price"
+    SKU="l.sku"; STOCK="l.stock_status"; SALES="l.total_sales"
+else
+    echo "$LOOKUP missing or incomplete, reading price, stock and SKU from postmeta"
+    META_JOINS=""
+    for key in _price _sku _stock_status total_sales; do
+        alias="pm_${key#_}"
+        META_JOINS="$META_JOINS LEFT JOIN ${TABLE_PREFIX}postmeta $alias ON $alias.post_id = p.ID AND $alias.meta_key = '$key'"
+    done
+    PRICE="pm_price.meta_value"; MIN_PRICE="CAST(pm_price.meta_value AS DECIMAL(19,4))"; MAX_PRICE="$MIN_PRICE"
+    SKU="pm_sku.meta_value"; STOCK="pm_stock_status.meta_value"; SALES="CAST(pm_total_sales.meta_value AS UNSIGNED)"
+fi
+
+FILTERS=""
+[[ "$in_stock" =~ ^[Yy] ]] && FILTERS="$FILTERS AND $STOCK = 'instock'"
+[[ -n "$min_price" ]] && FILTERS="$FILTERS AND $MIN_PRICE >= $min_price"
+[[ -n "$max_price" ]] && FILTERS="$FILTERS AND $MAX_PRICE <= $max_price"
+case "$sort_by" in
+    title) ORDER_BY="ORDER BY p.post_title" ;;
+    price) ORDER_BY="ORDER BY $MIN_PRICE" ;;
+    sku) ORDER_BY="ORDER BY $SKU" ;;
+    sales) ORDER_BY="ORDER BY $SALES DESC" ;;
+    *) ORDER_BY="" ;;
+esac
+
+# ------------------ Category Paths ------------------
+# Full category paths by term_taxonomy_id, loaded once and cached across runs by term_cache.py,
+# or plain category names in one query when python3 or its packages are unavailable
+TERM_PATHS=$(mktemp)
+trap 'rm -f "$TERM_PATHS"' EXIT
+if ! python3 -c "import mysql.connector, requests, dotenv" 2>/dev/null ||
+   ! python3 "$(dirname "$0")/term_cache.py" --website "$WEBSITE" > "$TERM_PATHS"; then
+    echo "Category paths unavailable, using category names"
+    if ! mysql_query "SELECT tt.term_taxonomy_id, t.name FROM ${TABLE_PREFIX}term_taxonomy tt
+                      JOIN ${TABLE_PREFIX}terms t ON t.term_id = tt.term_id WHERE tt.taxonomy = 'product_cat'" > "$TERM_PATHS"; then
+        echo "Error: Could not load product categories"
+        exit 1
+    fi
+fi
+
 # ------------------ Output File ------------------
 mkdir -p data
 TIMESTAMP=$(date +"%Y%m%d_%H%M%S")
 SANITIZED_DOMAIN=$(echo "$DOMAIN" | sed 's/[^a-zA-Z0-9]/_/g')
 OUTPUT_FILE="data/products_${SANITIZED_DOMAIN}_${TIMESTAMP}.csv"
 
-echo "Image,Title,Regular Price,Category,Short_description,Description" > "$OUTPUT_FILE"
+echo "Image,Title,Regular Price,Category,Short_description,Description,SKU,Stock Status" > "$OUTPUT_FILE"
 
 # ------------------ MySQL Query + CSV Output ------------------
-mysql -h "$DB_HOST" -u "$DB_USER" -p"$DB_PASS" "$DB_NAME" -N -e "
-  SELECT
-      CONCAT('https://$DOMAIN/wp-content/uploads/', pm_image.meta_value) AS image,
-      p.post_title,
-      COALESCE(
-        (SELECT meta_value FROM ${TABLE_PREFIX}postmeta WHERE post_id = p.ID AND meta_key = '_price'),
-        '0'
-      ) AS price,
-      COALESCE(
-        (SELECT GROUP_CONCAT(t.name SEPARATOR ', ')
-         FROM ${TABLE_PREFIX}term_relationships tr
-         JOIN ${TABLE_PREFIX}term_taxonomy tt ON tr.term_taxonomy_id = tt.term_taxonomy_id
-         JOIN ${TABLE_PREFIX}terms t ON tt.term_id = t.term_id
-         WHERE tr.object_id = p.ID AND tt.taxonomy = 'product_cat'
-         GROUP BY tr.object_id),
-        'Uncategorized'
-      ) AS category,
-      p.post_excerpt AS short_description,
-      p.post_content AS description
-  FROM ${TABLE_PREFIX}posts p
-  LEFT JOIN ${TABLE_PREFIX}postmeta pm_thumb ON pm_thumb.post_id = p.ID AND pm_thumb.meta_key = '_thumbnail_id'
-  LEFT JOIN ${TABLE_PREFIX}postmeta pm_image ON pm_image.post_id = pm_thumb.meta_value AND pm_image.meta_key = '_wp_attached_file'
-  WHERE p.post_type = 'product' AND p.post_status = 'publish'
-  LIMIT $num_products
-" | awk -F '\t' 'BEGIN {OFS=","}
+# The query lives in products_full.sql, shared with index_advisor.py
+PRODUCTS_SQL=$(<"$(dirname "$0")/products_full.sql")
+for pair in domain:DOMAIN price:PRICE sku:SKU stock:STOCK table_prefix:TABLE_PREFIX meta_joins:META_JOINS \
+            filters:FILTERS order_by:ORDER_BY limit:num_products; do
+    var=${pair#*:}
+    PRODUCTS_SQL=${PRODUCTS_SQL//"{${pair%%:*}}"/"${!var}"}
+done
+mysql_query "$PRODUCTS_SQL" | awk -F '\t' 'BEGIN {OFS=","}
+FILENAME == ARGV[1] { path[$1] = $2; next }   # term_taxonomy_id -> category path
 {
+  n = split($4, ids, ","); $4 = "";            # Keep only product_cat terms, as full paths
+  for (k = 1; k <= n; k++) if (ids[k] in path) $4 = $4 ($4 == "" ? "" : ", ") path[ids[k]];
+  if ($4 == "") $4 = "Uncategorized";
   for (i = 1; i <= NF; i++) {
     gsub(/\r/, "", $i);                     # Remove carriage returns
     gsub(/"/, "\"\"", $i);                 # Escape quotes
@@ -103,7 +158,7 @@ mysql -h "$DB_HOST" -u "$DB_USER" -p"$DB_PASS" "$DB_NAME" -N -e "
     $i = "\"" $i "\"";                     # Wrap in quotes
   }
   print
-}' >> "$OUTPUT_FILE"
+}' "$TERM_PATHS" - >> "$OUTPUT_FILE"
 
 # ------------------ Final Result ------------------
 if [ $? -eq 0 ]; then
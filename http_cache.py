@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for conditional requests.
+
+Stores response bodies with their ETag and Last-Modified values under
+data/http_cache/ so later runs can send If-None-Match / If-Modified-Since
+and reuse the cached body on 304 Not Modified. Total size is bounded with
+least-recently-used eviction.
+"""
+
+import os
+import json
+import gzip
+import time
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+CACHE_DIR = "data/http_cache"
+# Query parameters that identify the caller rather than the resource
+PRIVATE_PARAMS = ('consumer_key', 'consumer_secret')
+
+class HttpCache:
+    """Size-bounded LRU cache of response bodies keyed by URL."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, root=CACHE_DIR):
+        self.root, self.max_bytes = root, max_bytes
+        self.index_path = os.path.join(root, 'index.json')
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+
+    @staticmethod
+    def key(url, params):
+        """Cache key for a URL and its query parameters, ignoring credentials."""
+        query = urlencode(sorted((k, v) for k, v in (params or {}).items() if k not in PRIVATE_PARAMS))
+        return hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def validators(self, key):
+        """Conditional request headers for a cached entry, or {} if there is none."""
+        with self.lock:
+            entry = self.index.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, key):
+        """Cached body for a key (marking it recently used), or None."""
+        try:
+            with gzip.open(os.path.join(self.root, key), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            with self.lock:
+                self.index.pop(key, None)
+            return None
+        with self.lock:
+            if key in self.index:
+                self.index[key]['used'] = time.time()
+        return body
+
+    def store(self, key, body, etag=None, last_modified=None):
+        """Store a body if the response carried a validator, then evict to the size bound."""
+        if not etag and not last_modified:
+            return
+        path = os.path.join(self.root, key)
+        with gzip.open(f"{path}.tmp", 'wb', compresslevel=6) as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+        with self.lock:
+            self.index[key] = {'etag': etag, 'last_modified': last_modified,
+                               'size': os.path.getsize(path), 'used': time.time()}
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['size']
+            del self.index[key]
+            try:
+                os.remove(os.path.join(self.root, key))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Persist the index."""
+        with self.lock:
+            with open(f"{self.index_path}.tmp", 'w') as f:
+                json.dump(self.index, f)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Run EXPLAIN on the export queries for a website and suggest missing indexes.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import mysql.connector
+from db_connection import get_pooled_connection, close_pools
+from fetch_orders_database import ORDERS_QUERY, ORDER_ITEMS_QUERY
+
+# Product query of fetch_products_full.sh, from the shared template, with its wc_product_meta_lookup join,
+# in-stock and price range filters and price sort
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products_full.sql'), encoding='utf-8') as f:
+    PRODUCTS_QUERY = f.read().format(
+        table_prefix='{table_prefix}', domain='example.com', price='ROUND(l.min_price, 2)', sku='l.sku',
+        stock='l.stock_status', meta_joins='LEFT JOIN {table_prefix}wc_product_meta_lookup l ON l.product_id = p.ID',
+        filters="AND l.stock_status = 'instock' AND l.min_price >= %s AND l.max_price <= %s",
+        order_by='ORDER BY l.min_price', limit=10)
+
+# Activity queries used by monitor_activity.py
+ACTIVITY_QUERY = """
+    SELECT o.id, o.alert_id, o.created_on, o.user_id, u.user_login, u.user_email
+    FROM {table_prefix}wsal_occurrences o
+    LEFT JOIN {table_prefix}users u ON o.user_id = u.ID
+    ORDER BY o.created_on DESC LIMIT 5
+    """
+
+ACTIVITY_METADATA_QUERY = """
+    SELECT name, value FROM {table_prefix}wsal_metadata WHERE occurrence_id = %s
+    """
+
+# Indexes that make the export queries efficient, keyed by table name without prefix
+RECOMMENDED_INDEXES = {
+    'postmeta': ('post_id_meta_key', ['post_id', 'meta_key'], '(post_id, meta_key(191))'),
+    'posts': ('type_status_date', ['post_type', 'post_status', 'post_date', 'ID'], '(post_type, post_status, post_date, ID)'),
+    'woocommerce_order_items': ('order_id_type', ['order_id', 'order_item_type'], '(order_id, order_item_type)'),
+    'woocommerce_order_itemmeta': ('order_item_id_meta_key', ['order_item_id', 'meta_key'], '(order_item_id, meta_key(191))'),
+    'wc_product_meta_lookup': ('min_max_price', ['min_price', 'max_price'], '(min_price, max_price)'),
+    'term_taxonomy': ('taxonomy_term', ['taxonomy', 'term_id'], '(taxonomy, term_id)'),
+    'wsal_occurrences': ('created_on', ['created_on'], '(created_on)'),
+    'wsal_metadata': ('occurrence_id', ['occurrence_id'], '(occurrence_id)')
+}
+
+def get_export_queries(cursor, table_prefix):
+    """
+    Build the export queries with sample parameters for EXPLAIN.
+
+    Args:
+        cursor: MySQL dictionary cursor
+        table_prefix (str): WordPress table prefix
+
+    Returns:
+        list: List of (name, query, params) tuples
+    """
+    cursor.execute(f"SELECT MAX(order_id) AS id FROM {table_prefix}woocommerce_order_items")
+    order_id = (cursor.fetchone() or {}).get('id') or 0
+    return [
+        ('Orders (fetch_orders_database.py)', ORDERS_QUERY.format(table_prefix=table_prefix, filters=""), ()),
+        ('Order items (fetch_orders_database.py)', ORDER_ITEMS_QUERY.format(table_prefix=table_prefix), (order_id,)),
+        ('Products (fetch_products_full.sh)', PRODUCTS_QUERY.format(table_prefix=table_prefix), (0, 100)),
+        ('Activity (monitor_activity.py)', ACTIVITY_QUERY.format(table_prefix=table_prefix), ()),
+        ('Activity metadata (monitor_activity.py)', ACTIVITY_METADATA_QUERY.format(table_prefix=table_prefix), (0,))
+    ]
+
+def explain_query(cursor, query, params):
+    """
+    Run EXPLAIN and flag full scans, temporary tables and filesorts.
+
+    Args:
+        cursor: MySQL dictionary cursor
+        query (str): SQL query
+        params (tuple): Query parameters
+
+    Returns:
+        list: EXPLAIN rows, each with an added 'issues' list
+    """
+    cursor.execute(f"EXPLAIN {query}", params)
+    rows = cursor.fetchall()
+    for row in rows:
+        extra = row.get('Extra') or ''
+        row['issues'] = [issue for issue, found in (
+            ('full table scan', row.get('type') == 'ALL'),
+            ('full index scan', row.get('type') == 'index'),
+            ('temporary table', 'Using temporary' in extra),
+            ('filesort', 'Using filesort' in extra)
+        ) if found]
+    return rows
+
+def get_index_columns(cursor, table):
+    """
+    Get the column lists of every index on a table.
+
+    Args:
+        cursor: MySQL dictionary cursor
+        table (str): Table name
+
+    Returns:
+        list: List of column name lists, in index order
+    """
+    cursor.execute(f"SHOW INDEX FROM {table}")
+    indexes = {}
+    for row in cursor.fetchall():
+        indexes.setdefault(row['Key_name'], []).append((row['Seq_in_index'], row['Column_name'].lower()))
+    return [[col for _, col in sorted(cols)] for cols in indexes.values()]
+
+def suggest_indexes(cursor, table_prefix, flagged_tables):
+    """
+    Suggest covering indexes that are missing on flagged tables.
+
+    Args:
+        cursor: MySQL dictionary cursor
+        table_prefix (str): WordPress table prefix
+        flagged_tables (set): Table names (with prefix) that had issues in EXPLAIN
+
+    Returns:
+        list: ALTER TABLE statements
+    """
+    suggestions = []
+    for base, (name, columns, definition) in RECOMMENDED_INDEXES.items():
+        table = f"{table_prefix}{base}"
+        if table not in flagged_tables:
+            continue
+        try:
+            existing = get_index_columns(cursor, table)
+        except mysql.connector.Error:
+            continue
+        wanted = [col.lower() for col in columns]
+        if not any(cols[:len(wanted)] == wanted for cols in existing):
+            suggestions.append(f"ALTER TABLE {table} ADD INDEX {name} {definition};")
+    return suggestions
+
+def print_report(cursor, table_prefix):
+    """Print the EXPLAIN report and index suggestions for all export queries."""
+    flagged_tables = set()
+    aliases = {}
+
+    for name, query, params in get_export_queries(cursor, table_prefix):
+        print(f"\n{name}")
+        print("-" * 100)
+        try:
+            rows = explain_query(cursor, query, params)
+        except mysql.connector.Error as e:
+            print(f"  Skipped: {e}")
+            continue
+
+        # Map query aliases (p, pm, oi ...) back to table names
+        for table, alias in re.findall(rf"\b({re.escape(table_prefix)}\w+)\s+(?:AS\s+)?(\w+)", query):
+            aliases[alias] = table
+
+        for row in rows:
+            table = aliases.get(row.get('table'), row.get('table'))
+            print(f"  {table}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+                  f"{' -> ' + ', '.join(row['issues']) if row['issues'] else ''}")
+            if row['issues']:
+                flagged_tables.add(table)
+
+    print("\nSuggested indexes")
+    print("-" * 100)
+    suggestions = suggest_indexes(cursor, table_prefix, flagged_tables)
+    for statement in suggestions:
+        print(f"  {statement}")
+    if not suggestions:
+        print("  None. Existing indexes already cover the export queries.")
+
+def main():
+    """Main function to run the index advisor."""
+    parser = argparse.ArgumentParser(description='EXPLAIN export queries and suggest missing indexes')
+    parser.add_argument('--website', type=str, help='Website name (from config.json)')
+    args = parser.parse_args()
+
+    try:
+        with open('config.json') as config_file:
+            config = json.load(config_file)
+    except Exception as e:
+        print(f"Error loading config.json: {e}")
+        sys.exit(1)
+
+    websites = list(config['websites'].keys())
+    website = args.website
+    while website not in websites:
+        for i, name in enumerate(websites, 1):
+            print(f"{i}. {name}")
+        choice = input(f"Select website [1-{len(websites)}]: ").strip()
+        website = websites[int(choice) - 1] if choice.isdigit() and 1 <= int(choice) <= len(websites) else None
+
+    website_config = config['websites'][website]
+    try:
+        connection = get_pooled_connection(website_config)
+    except mysql.connector.Error as e:
+        print(f"Error connecting to MySQL database: {e}")
+        sys.exit(1)
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        print(f"Index report for {website} ({website_config['DATABASE_NAME']})")
+        print_report(cursor, website_config['DATABASE_TABLE_PREFIX'])
+    finally:
+        cursor.close()
+        connection.close()
+        close_pools()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON decoding for API responses.
+
+Prefers orjson, then simdjson, then the standard library. simdjson documents
+are decoded lazily, so only the fields an extract function touches are
+materialized; to_plain() converts them when a full copy is needed.
+iter_items() parses a response incrementally with ijson when it is installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+DECODERS = ('auto', 'orjson', 'simdjson', 'json')
+
+class JsonDecoder:
+    """JSON decoder chosen by name, falling back to the standard library."""
+
+    def __init__(self, name='auto'):
+        if name == 'auto':
+            name = 'orjson' if orjson else 'simdjson' if simdjson else 'json'
+        elif {'orjson': orjson, 'simdjson': simdjson}.get(name, json) is None:
+            print(f"⚠️ Warning: {name} is not installed. Using the standard library JSON decoder.")
+            name = 'json'
+        self.name = name
+
+    def loads(self, body):
+        """Decode a response body given as bytes."""
+        if self.name == 'orjson':
+            return orjson.loads(body)
+        if self.name == 'simdjson':
+            # A fresh parser per page keeps earlier lazy documents valid
+            return simdjson.Parser().parse(body)
+        return json.loads(body)
+
+def to_plain(value):
+    """Materialize a lazily decoded value into plain dicts and lists."""
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    if hasattr(value, 'as_list'):
+        return value.as_list()
+    return value
+
+def iter_items(chunks):
+    """Yield the elements of a top-level JSON array as its bytes arrive."""
+    if ijson is None:
+        yield from json.loads(b''.join(chunks))
+        return
+    events = ijson.sendable_list()
+    parser = ijson.items_coro(events, 'item', use_float=True)
+    try:
+        for chunk in chunks:
+            parser.send(chunk)
+            yield from events
+            del events[:]
+        parser.close()
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON in response: {e}") from e
+    yield from events
@@ -201,7 +201,8 @@ product_data_menu() {
     echo "=================="
     echo "1. Python implementation"
     echo "2. Node.js implementation"
-    echo "3. Back to main menu"
+    echo "3. Python combined - titles and data from one API pass"
+    echo "4. Back to main menu"
     read -p "Select option [1-4]: " pd_choice
     
     case $pd_choice in
@@ -234,6 +235,16 @@ product_data_menu() {
             fi
             ;;
         3)
+            select_website
+            echo "Running Combined Product Importer (Python)..."
+            read -p "Also save raw product JSON? (y/N): " save_raw
+            raw_flag=""
+            [[ $save_raw =~ ^[Yy]$ ]] && raw_flag="--raw"
+            if [ -n "$SELECTED_WEBSITE" ]; then
+                python3 fetch_products_combined_generic.py --website "$SELECTED_WEBSITE" $raw_flag
+            else
+                python3 fetch_products_combined_generic.py $raw_flag
+            fi
             ;;
         4)
             return
@@ -483,7 +494,7 @@ main() {
                 ;;
             10)
                 echo "Resetting data files..."
-                rm -f data/product_*.csv data/product_*.txt
+                rm -f data/product_*.csv data/product_*.txt data/products_combined_page_*.txt data/products_raw_*.jsonl data/product*_seen.bin data/term_cache_*.json
                 echo "All product data files removed from /data directory"
                 read -p "Press Enter to continue..."
                 ;;
@@ -5,6 +5,9 @@ from datetime import datetime
 import argparse
 import csv
 import json
+from run_metrics import metrics, add_metrics_arguments
+from profiling import profiled, add_profile_arguments
+from db_connection import get_pooled_connection, close_pools, decode_row
 
 # Load environment variables
 load_dotenv()
@@ -75,19 +78,13 @@ def diagnose_wsal_tables(cursor):
         print(f"Error fetching unique event IDs: {e}")
 
 def extract_metadata(occurrence_id, cursor, table_prefix='kdf_'):
-    """Extract metadata for a specific occurrence with detailed error handling"""
+    """Extract metadata for a specific occurrence with detailed error handling.
+    
+    Pass a prepared cursor to reuse the parsed statement across occurrences.
+    """
     metadata_table = f"{table_prefix}wsal_metadata"
     try:
-        # First, check if any metadata exists for this occurrence
-        cursor.execute(f"SELECT COUNT(*) as metadata_count FROM {metadata_table} WHERE occurrence_id = %s", (occurrence_id,))
-        count_result = cursor.fetchone()
-        metadata_count = count_result['metadata_count'] if count_result else 0
-        
-        if metadata_count == 0:
-            # No metadata found, but this isn't necessarily an error
-            return {}
-        
-        # If metadata exists, retrieve it
+        # An occurrence without metadata simply returns no rows
         cursor.execute(f"""
             SELECT name, value 
             FROM {metadata_table} 
@@ -98,9 +95,8 @@ def extract_metadata(occurrence_id, cursor, table_prefix='kdf_'):
         for row in cursor.fetchall():
             # Ensure we're working with strings
             try:
-                name = row['name'].decode('utf-8') if isinstance(row['name'], bytes) else str(row['name'])
-                value = row['value'].decode('utf-8') if isinstance(row['value'], bytes) else str(row['value'])
-                metadata[name] = value
+                decoded = decode_row(row)
+                metadata[str(decoded['name'])] = str(decoded['value'])
             except Exception as conversion_error:
                 print(f"Error converting metadata for occurrence {occurrence_id}: {conversion_error}")
                 print(f"Raw data - Name: {row['name']}, Value: {row['value']}")
@@ -120,6 +116,14 @@ def get_table_columns(cursor, table_name):
         print(f"Error retrieving columns for {table_name}: {e}")
         return []
 
+def table_exists(cursor, table_name):
+    """Check if a table exists in the current database using a prepared cursor"""
+    cursor.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table_name,)
+    )
+    return bool(cursor.fetchall())
+
 def check_tables_exist(cursor):
     """Check if the required tables exist in the database"""
     print("Checking for activity log tables...")
@@ -173,6 +177,8 @@ def main():
     parser.add_argument('--csv', type=str, help='Export results to CSV file')
     parser.add_argument('--diagnose', action='store_true', help='Run table diagnostic information')
     parser.add_argument('--prefix', type=str, help='Database table prefix (overrides environment variable)')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
     # Interactive mode if domain not provided
@@ -219,7 +225,13 @@ def main():
 
     # Get domain configuration
     config = get_domain_config(args.domain)
+    metrics.configure('monitor_activity', config['domain'], args.metrics, args.metrics_file, args.metrics_interval)
 
+    with profiled('monitor_activity', args):
+        monitor(args, config)
+
+def monitor(args, config):
+    """Connect to the domain's database and print or export its recent activity."""
     try:
         # Validate configuration
         if not all(config.values()):
@@ -227,13 +239,14 @@ def main():
 
         # Establish database connection
         print(f"\nConnecting to {config['domain']}...")
-        connection = mysql.connector.connect(
-            host=config['ip'],
-            database=config['database_name'],
-            user=config['database_user'],
-            password=config['database_password'],
-            connect_timeout=5
-        )
+        connection = get_pooled_connection({
+            'DATABASE_IP': config['ip'],
+            'DATABASE_NAME': config['database_name'],
+            'DATABASE_USER': config['database_user'],
+            'DATABASE_PASSWORD': config['database_password'],
+            'DATABASE_CONNECT_TIMEOUT': os.getenv(f"DATABASE_CONNECT_TIMEOUT_{args.domain}", 5),
+            'DATABASE_COMPRESS': os.getenv(f"DATABASE_COMPRESS_{args.domain}", 'false')
+        })
 
         if connection.is_connected():
             cursor = connection.cursor(dictionary=True)
@@ -253,12 +266,10 @@ def main():
             wsal_occurrences = f"{table_prefix}wsal_occurrences"
             wsal_metadata = f"{table_prefix}wsal_metadata"
             
-            # Check if the tables exist
-            cursor.execute(f"SHOW TABLES LIKE '{wsal_occurrences}'")
-            occurrences_exists = cursor.fetchone() is not None
-            
-            cursor.execute(f"SHOW TABLES LIKE '{wsal_metadata}'")
-            metadata_exists = cursor.fetchone() is not None
+            # Check if the tables exist, reusing one prepared statement
+            exists_cursor = connection.cursor(prepared=True)
+            occurrences_exists = table_exists(exists_cursor, wsal_occurrences)
+            metadata_exists = table_exists(exists_cursor, wsal_metadata)
             
             if not occurrences_exists:
                 print(f"Table {wsal_occurrences} does not exist. Looking for product view data in other tables...")
@@ -268,11 +279,8 @@ def main():
                 postmeta_table = f"{table_prefix}postmeta"
                 
                 # Check if these tables exist
-                cursor.execute(f"SHOW TABLES LIKE '{posts_table}'")
-                posts_exists = cursor.fetchone() is not None
-                
-                cursor.execute(f"SHOW TABLES LIKE '{postmeta_table}'")
-                postmeta_exists = cursor.fetchone() is not None
+                posts_exists = table_exists(exists_cursor, posts_table)
+                postmeta_exists = table_exists(exists_cursor, postmeta_table)
                 
                 if posts_exists and postmeta_exists:
                     # Query for recently viewed products
@@ -409,8 +417,11 @@ def main():
             print("Executing query:", query)
             print("Parameters:", params)
             
-            cursor.execute(query, params)
-            records = cursor.fetchall()
+            with metrics.phase('activity_query'):
+                cursor.execute(query, params)
+                records = cursor.fetchall()
+            metrics.add('records', len(records))
+            meta_cursor = connection.cursor(prepared=True, dictionary=True)
             
             # Prepare CSV if requested
             csv_file = None
@@ -461,7 +472,8 @@ def main():
                 metadata = {}
                 if metadata_exists:
                     try:
-                        metadata = extract_metadata(occurrence_id, cursor, table_prefix)
+                        with metrics.phase('metadata_query'):
+                            metadata = extract_metadata(occurrence_id, meta_cursor, table_prefix)
                     except Exception as meta_error:
                         print(f"Error extracting metadata for occurrence {occurrence_id}: {meta_error}")
                 
@@ -512,10 +524,13 @@ def main():
     except Exception as e:
         print(f"Unexpected error: {e}")
     finally:
-        if 'connection' in locals() and connection.is_connected():
-            cursor.close()
+        if 'connection' in locals():
+            if 'cursor' in locals():
+                cursor.close()
             connection.close()
+            close_pools()
             print("Database connection closed")
+        metrics.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
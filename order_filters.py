@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Order selection shared by the REST and database order exports.
+
+One OrderFilter built from the command line becomes REST query parameters
+for /orders or a SQL condition on the shop_order posts, so both backends
+only fetch the orders that were asked for. Dates are site-local time; the
+lower bound is inclusive and the upper bound exclusive.
+"""
+
+import copy
+from datetime import datetime, timedelta
+
+API_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+def parse_date(value):
+    """Parse YYYY-MM-DD or an ISO 8601 date-time from the command line."""
+    return datetime.fromisoformat(value)
+
+def add_filter_arguments(parser):
+    """Add the shared order filter options to an argument parser."""
+    parser.add_argument('--days', type=int, help='Number of days to look back for orders')
+    parser.add_argument('--after', '--start', dest='after', type=parse_date, help='Orders created on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--before', '--end', dest='before', type=parse_date, help='Orders created before this date (YYYY-MM-DD)')
+    parser.add_argument('--status', type=str, help='Comma separated order statuses, e.g. processing,on-hold')
+    parser.add_argument('--customer', type=int, help='Customer user ID')
+    parser.add_argument('--modified-after', type=parse_date, help='Orders modified on or after this date (YYYY-MM-DD)')
+
+class OrderFilter:
+    """Status, customer and date restrictions for an order export."""
+
+    def __init__(self, status=None, after=None, before=None, customer=None, modified_after=None, days=None):
+        self.statuses = [s.strip() for s in status.split(',') if s.strip()] if status else []
+        self.after = datetime.now().replace(microsecond=0) - timedelta(days=days) if days else after
+        self.before, self.customer, self.modified_after = before, customer, modified_after
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.status, args.after, args.before, args.customer, args.modified_after, args.days)
+
+    def between(self, after, before):
+        """Copy of this filter restricted to orders created in [after, before)."""
+        window = copy.copy(self)
+        window.after, window.before = after, before
+        return window
+
+    def rest_params(self):
+        """Query parameters for the /orders endpoint."""
+        params = {}
+        if self.statuses:
+            params['status'] = ','.join(self.statuses)
+        if self.after:
+            # The API bound is exclusive, so step back one second to include 'after'
+            params['after'] = (self.after - timedelta(seconds=1)).strftime(API_DATE_FORMAT)
+        if self.before:
+            params['before'] = self.before.strftime(API_DATE_FORMAT)
+        if self.customer is not None:
+            params['customer'] = self.customer
+        if self.modified_after:
+            params['modified_after'] = (self.modified_after - timedelta(seconds=1)).strftime(API_DATE_FORMAT)
+        return params
+
+    def matches(self, order):
+        """Whether a stored REST order falls inside this filter, as the /orders endpoint would decide."""
+        created = datetime.fromisoformat(order['date_created'])
+        modified = order.get('date_modified') or order.get('date_modified_gmt')
+        return ((not self.statuses or order.get('status') in {s.removeprefix('wc-') for s in self.statuses})
+                and (not self.after or created >= self.after)
+                and (not self.before or created < self.before)
+                and (self.customer is None or order.get('customer_id') == self.customer)
+                and (not self.modified_after or (modified and datetime.fromisoformat(modified) >= self.modified_after)))
+
+    def sql(self, table_prefix, alias='p'):
+        """
+        SQL condition on shop_order posts as bound parameters.
+
+        Returns:
+            tuple: (condition starting with AND, or empty; parameter list)
+        """
+        conditions, params = [], []
+        if self.statuses:
+            conditions.append(f"{alias}.post_status IN ({', '.join(['%s'] * len(self.statuses))})")
+            params.extend(s if s.startswith('wc-') else f'wc-{s}' for s in self.statuses)
+        if self.after:
+            conditions.append(f"{alias}.post_date >= %s")
+            params.append(self.after)
+        if self.before:
+            conditions.append(f"{alias}.post_date < %s")
+            params.append(self.before)
+        if self.customer is not None:
+            conditions.append(f"EXISTS (SELECT 1 FROM {table_prefix}postmeta cu WHERE cu.post_id = {alias}.ID "
+                              f"AND cu.meta_key = '_customer_user' AND cu.meta_value = %s)")
+            params.append(str(self.customer))
+        if self.modified_after:
+            conditions.append(f"{alias}.post_modified >= %s")
+            params.append(self.modified_after)
+        return ' '.join(f"AND {condition}" for condition in conditions), params
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Raw API page archive used for replaying extraction without network access.
+
+Each page is stored as gzip-compressed JSONL at
+data/archive/<website>/<endpoint>/<page>.jsonl.gz, one item per line.
+"""
+
+import os
+import gzip
+import json
+from json_codec import to_plain
+
+ARCHIVE_DIR = "data/archive"
+
+class PageArchive:
+    """Compressed JSONL pages for one website and endpoint."""
+
+    def __init__(self, website_name, endpoint, root=ARCHIVE_DIR):
+        self.directory = os.path.join(root, website_name or 'default', endpoint.replace('/', '_'))
+
+    def path(self, page):
+        return os.path.join(self.directory, f"{page:06d}.jsonl.gz")
+
+    def save(self, page, items):
+        """Store one page of raw API items, replacing any earlier copy."""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self.path(page)}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.writelines(json.dumps(to_plain(item), ensure_ascii=False) + '\n' for item in items)
+        os.replace(temp_path, self.path(page))
+
+    def clear(self):
+        """Remove every archived page, so a fresh run leaves no stale pages from a longer earlier one."""
+        for page in self.pages():
+            os.remove(self.path(page))
+
+    def load(self, page):
+        """Load one archived page, or None if it was never archived."""
+        try:
+            with gzip.open(self.path(page), 'rt', encoding='utf-8') as f:
+                return [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return None
+
+    def pages(self):
+        """Sorted page numbers present in the archive."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(name.split('.')[0]) for name in os.listdir(self.directory) if name.endswith('.jsonl.gz'))
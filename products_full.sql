@@ -0,0 +1,19 @@
+-- Product export query shared by fetch_products_full.sh and index_advisor.py.
+-- Placeholders in braces are filled in by both: price, SKU and stock columns come from
+-- wc_product_meta_lookup or postmeta joins, filters and order_by from the prompts.
+SELECT
+    CONCAT('https://{domain}/wp-content/uploads/', pm_image.meta_value) AS image,
+    p.post_title,
+    COALESCE({price}, '0') AS price,
+    (SELECT GROUP_CONCAT(tr.term_taxonomy_id) FROM {table_prefix}term_relationships tr WHERE tr.object_id = p.ID) AS category,
+    p.post_excerpt AS short_description,
+    p.post_content AS description,
+    COALESCE({sku}, '') AS sku,
+    COALESCE({stock}, '') AS stock_status
+FROM {table_prefix}posts p
+{meta_joins}
+LEFT JOIN {table_prefix}postmeta pm_thumb ON pm_thumb.post_id = p.ID AND pm_thumb.meta_key = '_thumbnail_id'
+LEFT JOIN {table_prefix}postmeta pm_image ON pm_image.post_id = pm_thumb.meta_value AND pm_image.meta_key = '_wp_attached_file'
+WHERE p.post_type = 'product' AND p.post_status = 'publish' {filters}
+{order_by}
+LIMIT {limit}
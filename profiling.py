@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Shared --profile support for the entry points.
+
+Captures cProfile stats or stack samples plus a tracemalloc snapshot into
+data/profiles/, optionally as a flamegraph-ready collapsed-stack file.
+cProfile follows one thread, so each thread started during the run gets its
+own profiler and their stats are merged with the main thread's.
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = "data/profiles"
+
+def add_profile_arguments(parser):
+    """Add the shared --profile options to an argument parser."""
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=['cprofile', 'sampling'],
+                        help='Profile the run with cProfile (default) or a stack sampler, plus tracemalloc')
+    parser.add_argument('--profile-collapsed', action='store_true',
+                        help='Also write a collapsed-stack file for flamegraph.pl or speedscope')
+    parser.add_argument('--profile-interval', type=float, default=5.0, help='Sampling interval in milliseconds (default: 5)')
+
+class StackSampler(threading.Thread):
+    """Sample the stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+def write_collapsed(stacks, path):
+    """Write stack counts in the folded format used by flamegraph.pl."""
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+@contextmanager
+def profiled(tool, args):
+    """
+    Profile the enclosed block when --profile or --profile-collapsed was given.
+
+    Args:
+        tool (str): Tool name used in the output file names
+        args (argparse.Namespace): Parsed arguments with the profile options
+    """
+    mode = args.profile or ('sampling' if args.profile_collapsed else None)
+    if not mode:
+        yield
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{tool}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    profiler = cProfile.Profile() if mode == 'cprofile' else None
+    thread_profilers = []
+
+    def profile_thread(frame, event, arg):
+        # First event in a new thread: replace this hook with the thread's own profiler
+        thread_profiler = cProfile.Profile()
+        thread_profilers.append(thread_profiler)
+        thread_profiler.enable()
+    sampler = StackSampler(args.profile_interval / 1000) if mode == 'sampling' or args.profile_collapsed else None
+
+    tracemalloc.start(25)
+    if sampler:
+        sampler.start()
+    if profiler:
+        threading.setprofile(profile_thread)
+        profiler.enable()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if profiler:
+            profiler.disable()
+            threading.setprofile(None)
+        if sampler:
+            sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"\nProfile ({mode}, {elapsed:.2f}s, peak traced memory {peak / 1048576:.1f} MB):")
+        if profiler:
+            stats = pstats.Stats(profiler)
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+            stats.dump_stats(f"{base}.prof")
+            stats.sort_stats('cumulative').print_stats(15)
+            print(f"cProfile stats: {base}.prof ({len(thread_profilers) + 1} threads)")
+        if sampler:
+            if mode == 'sampling':
+                for stack, count in sampler.stacks.most_common(10):
+                    print(f"  {count:>6}  {stack.rsplit(';', 1)[-1]}")
+            write_collapsed(sampler.stacks, f"{base}.collapsed")
+            print(f"Collapsed stacks: {base}.collapsed")
+        snapshot.dump(f"{base}.tracemalloc")
+        for stat in snapshot.statistics('lineno')[:10]:
+            print(f"  {stat}")
+        print(f"tracemalloc snapshot: {base}.tracemalloc")
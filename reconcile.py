@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Reconcile a local store of products or orders with the live site.
+
+Lists the remote collection with _fields=id,date_modified_gmt at the maximum
+page size, diffs it against data/<entity>_raw_<website>.jsonl, fetches only
+new and changed records, marks deletions, and rebuilds the CSV exports from
+the refreshed store. The order export writes the orders store with
+--raw-store; with an order filter only stored orders inside it are diffed,
+the rest are left as they are.
+"""
+
+import os
+import sys
+import json
+import argparse
+import requests
+from datetime import datetime
+from woo_pipeline import (load_configuration, select_website_interactive, fetch_page, CsvSink,
+                          MAX_PER_PAGE, STABLE_ORDER)
+from json_codec import to_plain
+from order_filters import OrderFilter, add_filter_arguments
+from term_cache import api_term_cache
+from run_metrics import metrics, add_metrics_arguments
+from profiling import profiled, add_profile_arguments
+import fetch_product_data_main_generic as product_data
+import fetch_product_titles_main_generic as product_titles
+import fetch_orders_api_generic as orders_api
+from fetch_products_combined_generic import product_data_row_from_item
+
+def store_path(entity, website_name):
+    """Local JSONL store: the combined export's --raw output for products, the order export's --raw-store output for orders."""
+    return f"data/{entity}_raw_{website_name}.jsonl"
+
+def csv_sinks(entity, website_name, terms=None):
+    """CSV exports rebuilt from the store after reconciling, with category paths from the term cache."""
+    if entity == 'orders':
+        return orders_api.order_sinks(website_name)
+    return [
+        CsvSink(product_titles.get_file_paths(website_name)[0], ['Product Title'],
+                lambda product: [product_titles.extract_title(product)], 'titles'),
+        CsvSink(product_data.get_file_paths(website_name)[0], product_data.PRODUCT_DATA_HEADER,
+                lambda product: product_data_row_from_item(product, terms), 'products')
+    ]
+
+def load_store(path):
+    """Load the local store as {id: item}, or {} if there is none yet."""
+    store = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                item = json.loads(line)
+                store[item['id']] = item
+    except FileNotFoundError:
+        pass
+    return store
+
+def save_store(path, store):
+    """Write the store in ID order, replacing the old file atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(store[item_id], ensure_ascii=False) + '\n' for item_id in sorted(store))
+    os.replace(f"{path}.tmp", path)
+
+def list_remote(session, config, endpoint, params=None):
+    """
+    List every record's ID and modification time with the smallest possible pages.
+
+    Returns:
+        dict: {id: date_modified_gmt}, or None if a request failed
+    """
+    remote, page = {}, 1
+    while True:
+        items = fetch_page(session, config, endpoint, page, MAX_PER_PAGE,
+                           {**(params or {}), **STABLE_ORDER, '_fields': 'id,date_modified_gmt'})
+        if items is None:
+            return None
+        remote.update((item['id'], item.get('date_modified_gmt')) for item in items)
+        if len(items) < MAX_PER_PAGE:
+            return remote
+        page += 1
+
+def reconcile(config, website_name, entity, order_filter=None):
+    """
+    Bring the local store and CSV exports for one entity in line with the site.
+
+    order_filter restricts the orders listed and the stored orders diffed against them.
+
+    Returns:
+        dict: Counts of new, changed and deleted records
+    """
+    path = store_path(entity, website_name)
+    if entity == 'orders' and not os.path.exists(path):
+        print(f"❌ No order store at {path}. Export orders with fetch_orders_api_generic.py --raw-store first.")
+        return None
+    store = load_store(path)
+    print(f"\n🔄 Reconciling {len(store)} local {entity} with {config['SITE_URL']}")
+
+    with requests.Session() as session:
+        remote = list_remote(session, config, entity, order_filter.rest_params() if order_filter else None)
+        if remote is None:
+            print("❌ Could not list remote records. Local store left unchanged.")
+            return None
+
+        # Only stored orders inside the filter were listed, so only they can be new, changed or deleted
+        live = {item_id for item_id, item in store.items()
+                if not item.get('_deleted') and (order_filter is None or order_filter.matches(item))}
+        new = [item_id for item_id in remote if item_id not in live]
+        changed = [item_id for item_id in remote if item_id in live
+                   and store[item_id].get('date_modified_gmt') != remote[item_id]]
+        deleted = live - remote.keys()
+        print(f"📊 {len(new)} new, {len(changed)} changed, {len(deleted)} deleted")
+
+        wanted = sorted(new + changed)
+        for start in range(0, len(wanted), MAX_PER_PAGE):
+            include = ','.join(map(str, wanted[start:start + MAX_PER_PAGE]))
+            items = fetch_page(session, config, entity, 1, MAX_PER_PAGE, {'include': include})
+            if items is None:
+                print("❌ Fetch failed. Local store left unchanged.")
+                return None
+            store.update((item['id'], to_plain(item)) for item in items)
+            metrics.add('records', len(items))
+
+    deleted_at = datetime.now().isoformat(timespec='seconds')
+    for item_id in deleted:
+        store[item_id]['_deleted'] = deleted_at
+    save_store(path, store)
+
+    terms = api_term_cache(config, website_name) if entity == 'products' else None
+    for sink in csv_sinks(entity, website_name, terms):
+        sink.open(resume=False)
+        try:
+            sink.write([item for item in store.values() if not item.get('_deleted')])
+        finally:
+            sink.close()
+
+    print(f"\n✅ Finished! Store saved to {path}")
+    return {'new': len(new), 'changed': len(changed), 'deleted': len(deleted)}
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Reconcile local WooCommerce exports with the live site')
+    parser.add_argument('--website', type=str, help='Website name (from config.json)')
+    parser.add_argument('--entity', choices=['products', 'orders'], help='Collection to reconcile')
+    add_filter_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.website:
+        website_name, config = args.website, load_configuration(args.website)
+    else:
+        website_name, config = select_website_interactive()
+        if not config:
+            sys.exit(1)
+    entity = args.entity or ('orders' if input("Reconcile products or orders? [products]: ").strip().lower() == 'orders'
+                             else 'products')
+
+    metrics.configure('reconcile', website_name, args.metrics, args.metrics_file, args.metrics_interval)
+    try:
+        with profiled('reconcile', args):
+            reconcile(config, website_name, entity, OrderFilter.from_args(args) if entity == 'orders' else None)
+    except KeyboardInterrupt:
+        print("\n⚠️ Process interrupted by user. Local store left unchanged.")
+    finally:
+        metrics.finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Per-run metrics shared by the fetchers and exporters.
+
+Records per-phase timers, counters (records, bytes, retries) and gauges
+(queue depths) and writes them as JSON lines or a Prometheus textfile.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+class RunMetrics:
+    """Thread-safe timers, counters and gauges for one tool run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.labels = {'tool': 'unknown', 'website': 'default'}
+        self.started = time.time()
+        self.phases = {}
+        self.counters = {}
+        self.gauges = {}
+        self.output = None
+        self.format = None
+        self.stop_event = threading.Event()
+
+    def configure(self, tool, website=None, fmt=None, path=None, interval=None):
+        """
+        Set run labels and enable output.
+
+        Args:
+            tool (str): Tool name, e.g. fetch_orders_api
+            website (str, optional): Website name
+            fmt (str, optional): 'jsonl' or 'prometheus'; None disables output
+            path (str, optional): Output file (default data/metrics/<tool>_<website>.jsonl or .prom)
+            interval (float, optional): Also emit every N seconds while running
+        """
+        self.labels = {'tool': tool, 'website': website or 'default'}
+        self.format = fmt
+        if fmt:
+            extension = 'prom' if fmt == 'prometheus' else 'jsonl'
+            self.output = path or f"data/metrics/{tool}_{self.labels['website']}.{extension}"
+            os.makedirs(os.path.dirname(self.output) or '.', exist_ok=True)
+        if fmt and interval:
+            threading.Thread(target=self._emit_every, args=(interval,), daemon=True).start()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and add it to the named phase total."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                count, total = self.phases.get(name, (0, 0.0))
+                self.phases[name] = (count + 1, total + elapsed)
+
+    def add(self, name, value=1):
+        """Increment a counter such as records, bytes or retries."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        """Set a point-in-time value such as a queue depth."""
+        with self.lock:
+            self.gauges[name] = value
+
+    def snapshot(self):
+        """Current metrics as a JSON-serialisable dict."""
+        with self.lock:
+            elapsed = time.time() - self.started
+            return {
+                **self.labels,
+                'timestamp': round(time.time(), 3),
+                'elapsed_seconds': round(elapsed, 3),
+                'records_per_second': round(self.counters.get('records', 0) / elapsed, 2) if elapsed else 0.0,
+                'phases': {name: {'count': count, 'seconds': round(total, 4)} for name, (count, total) in self.phases.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges)
+            }
+
+    def emit(self):
+        """Write the current snapshot to the configured output."""
+        if not self.format:
+            return
+        data = self.snapshot()
+        if self.format == 'jsonl':
+            with open(self.output, 'a') as f:
+                f.write(json.dumps(data) + '\n')
+            return
+
+        # Prometheus textfile collectors expect the file to be replaced atomically
+        labels = ','.join(f'{key}="{value}"' for key, value in self.labels.items())
+        lines = [f'woocommerce_elapsed_seconds{{{labels}}} {data["elapsed_seconds"]}',
+                 f'woocommerce_records_per_second{{{labels}}} {data["records_per_second"]}']
+        for name, phase in data['phases'].items():
+            lines.append(f'woocommerce_phase_seconds_total{{{labels},phase="{name}"}} {phase["seconds"]}')
+            lines.append(f'woocommerce_phase_calls_total{{{labels},phase="{name}"}} {phase["count"]}')
+        lines += [f'woocommerce_{name}_total{{{labels}}} {value}' for name, value in data['counters'].items()]
+        lines += [f'woocommerce_{name}{{{labels}}} {value}' for name, value in data['gauges'].items()]
+        with open(f"{self.output}.tmp", 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(f"{self.output}.tmp", self.output)
+
+    def finish(self):
+        """Stop interval emission and write the final snapshot."""
+        self.stop_event.set()
+        self.emit()
+        if self.format:
+            print(f"Metrics written to {self.output}")
+
+    def _emit_every(self, interval):
+        while not self.stop_event.wait(interval):
+            self.emit()
+
+def add_metrics_arguments(parser):
+    """Add the shared --metrics options to an argument parser."""
+    parser.add_argument('--metrics', choices=['jsonl', 'prometheus'], help='Write run metrics as JSON lines or a Prometheus textfile')
+    parser.add_argument('--metrics-file', type=str, help='Metrics output file (default: data/metrics/<tool>_<website>.<ext>)')
+    parser.add_argument('--metrics-interval', type=float, help='Also write metrics every N seconds during the run')
+
+# Shared instance used by every tool in the process
+metrics = RunMetrics()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Product category paths, loaded once and cached across runs.
+
+Reads every product_cat term and its parent either from the database
+(terms and term_taxonomy) or from /products/categories, resolves full
+"Parent > Child" paths in memory and keeps the terms in
+data/term_cache_<website>_<source>.json for a TTL, so products get their
+categories by dictionary lookup instead of a term join per product.
+
+Run directly to print term_taxonomy_id<TAB>path lines for fetch_products_full.sh.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import requests
+from woo_pipeline import get_website_config, fetch_page, with_retries, FetchError, MAX_PER_PAGE, STABLE_ORDER
+
+CACHE_TTL = 24 * 3600
+PATH_SEPARATOR = ' > '
+
+class TermCache:
+    """Full category paths keyed by term ID, and by term_taxonomy_id for database rows."""
+
+    def __init__(self, terms, taxonomy_ids=None):
+        self.terms, self.taxonomy_ids = terms, taxonomy_ids or {}
+        self.paths = {term_id: self._resolve(term_id) for term_id in terms}
+
+    def _resolve(self, term_id):
+        names, seen = [], set()
+        # Walk up the parents; the seen set guards against corrupt parent loops
+        while term_id in self.terms and term_id not in seen:
+            seen.add(term_id)
+            name, term_id = self.terms[term_id]
+            names.append(name)
+        return PATH_SEPARATOR.join(reversed(names))
+
+    def category_paths(self, categories):
+        """Comma separated full paths for a product's categories list from the REST API."""
+        return ', '.join(self.paths.get(category['id'], category['name']) for category in categories)
+
+    def taxonomy_paths(self):
+        """Full paths keyed by term_taxonomy_id."""
+        return {tt_id: self.paths[term_id] for tt_id, term_id in self.taxonomy_ids.items() if term_id in self.paths}
+
+def load_terms_from_api(config):
+    """
+    Load product categories from /products/categories.
+
+    Returns:
+        tuple: ({term_id: (name, parent)}, {}), or None if a request failed
+    """
+    terms, page = {}, 1
+    with requests.Session() as session:
+        while True:
+            try:
+                items = with_retries(lambda: fetch_page(session, config, 'products/categories', page, MAX_PER_PAGE,
+                                                        {**STABLE_ORDER, '_fields': 'id,name,parent'}),
+                                     f"categories page {page}")
+            except FetchError:
+                return None
+            terms.update((item['id'], (item['name'], item['parent'])) for item in items)
+            if len(items) < MAX_PER_PAGE:
+                return terms, {}
+            page += 1
+
+def load_terms_from_db(connection, table_prefix):
+    """
+    Load product categories from terms and term_taxonomy in one query.
+
+    Returns:
+        tuple: ({term_id: (name, parent)}, {term_taxonomy_id: term_id})
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT tt.term_taxonomy_id, tt.term_id, t.name, tt.parent
+            FROM {table_prefix}term_taxonomy tt
+            JOIN {table_prefix}terms t ON t.term_id = tt.term_id
+            WHERE tt.taxonomy = 'product_cat'""")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return ({term_id: (name, parent) for _, term_id, name, parent in rows},
+            {tt_id: term_id for tt_id, term_id, _, _ in rows})
+
+def load_term_cache(website_name, source, loader, ttl=CACHE_TTL, offline=False):
+    """
+    Term cache from disk if it is younger than ttl, otherwise from loader() and saved for later runs.
+
+    Args:
+        website_name (str): Website name, part of the cache file name
+        source (str): 'api' or 'db'; term_taxonomy_ids are only known to the database
+        loader (callable): Returns (terms, taxonomy_ids) or None on failure
+        ttl (int): Maximum cache age in seconds; 0 always reloads
+        offline (bool): Use the cache whatever its age and never call the loader
+
+    Returns:
+        TermCache: Loaded terms, or None if the loader failed or there is no cache offline
+    """
+    path = f"data/term_cache_{website_name}_{source}.json"
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if offline or time.time() - data['saved'] < ttl:
+            return TermCache({int(k): tuple(v) for k, v in data['terms'].items()},
+                             {int(k): v for k, v in data['taxonomy_ids'].items()})
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    if offline:
+        return None
+
+    loaded = loader()
+    if loaded is None:
+        return None
+    terms, taxonomy_ids = loaded
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump({'saved': time.time(), 'terms': terms, 'taxonomy_ids': taxonomy_ids}, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+    return TermCache(terms, taxonomy_ids)
+
+def api_term_cache(config, website_name, ttl=CACHE_TTL, offline=False):
+    """
+    Term cache for the REST exports, or None (with a warning) if categories could not be loaded.
+
+    Offline runs (--replay, --plan) only read an existing cache, however old.
+    """
+    terms = load_term_cache(website_name, 'api', lambda: load_terms_from_api(config), ttl, offline)
+    if terms is None and not offline:
+        print("⚠️ Warning: Could not load product categories. Using first category names.")
+    return terms
+
+def main():
+    """Print term_taxonomy_id<TAB>full path for every product category in a website's database."""
+    parser = argparse.ArgumentParser(description='Print cached product category paths from the database')
+    parser.add_argument('--website', type=str, required=True, help='Website name (from config.json)')
+    parser.add_argument('--ttl', type=int, default=CACHE_TTL, help='Maximum cache age in seconds (0 reloads)')
+    args = parser.parse_args()
+
+    # Imported here so the REST exports do not need the MySQL driver
+    import mysql.connector
+    from db_connection import get_pooled_connection, close_pools
+
+    config = get_website_config(args.website)
+
+    def load():
+        connection = get_pooled_connection(config)
+        try:
+            return load_terms_from_db(connection, config['DATABASE_TABLE_PREFIX'])
+        finally:
+            connection.close()
+            close_pools()
+
+    try:
+        terms = load_term_cache(args.website, 'db', load, args.ttl)
+    except mysql.connector.Error as e:
+        print(f"Error loading product categories: {e}", file=sys.stderr)
+        sys.exit(1)
+    for tt_id, path in terms.taxonomy_paths().items():
+        print(f"{tt_id}\t{path}")
+
+if __name__ == "__main__":
+    main()
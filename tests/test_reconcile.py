@@ -0,0 +1,57 @@
+import os
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import reconcile
+from order_filters import OrderFilter
+
+def order(order_id, created, status='completed'):
+    return {'id': order_id, 'status': status, 'total': '10.00', 'date_created': created,
+            'date_modified_gmt': created, 'billing': {'first_name': 'A', 'last_name': 'B', 'email': 'a@b.c', 'phone': '1'}}
+
+class FilteredReconcileTest(unittest.TestCase):
+    def test_stored_orders_outside_the_filter_are_kept(self):
+        stored = [order(1, '2021-03-01T10:00:00'), order(2, '2021-06-01T10:00:00'), order(3, '2023-01-01T10:00:00')]
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                reconcile.save_store(reconcile.store_path('orders', 'test'), {item['id']: item for item in stored})
+                remote = {3: '2023-01-01T10:00:00'}
+                with mock.patch.object(reconcile, 'list_remote', return_value=remote) as listed, \
+                        mock.patch.object(reconcile, 'fetch_page') as fetched:
+                    counts = reconcile.reconcile({'SITE_URL': 'http://test'}, 'test', 'orders',
+                                                 OrderFilter(after=datetime(2022, 1, 1)))
+                store = reconcile.load_store(reconcile.store_path('orders', 'test'))
+                with open('data/order_data_test.csv', encoding='utf-8') as f:
+                    rows = f.read().splitlines()
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(listed.call_args.args[3]['after'], '2021-12-31T23:59:59')
+        fetched.assert_not_called()
+        self.assertEqual(counts, {'new': 0, 'changed': 0, 'deleted': 0})
+        self.assertFalse(any(item.get('_deleted') for item in store.values()))
+        self.assertEqual(len(rows), 4)
+
+    def test_filtered_order_missing_remotely_is_deleted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                reconcile.save_store(reconcile.store_path('orders', 'test'),
+                                     {1: order(1, '2021-03-01T10:00:00'), 3: order(3, '2023-01-01T10:00:00')})
+                with mock.patch.object(reconcile, 'list_remote', return_value={}):
+                    counts = reconcile.reconcile({'SITE_URL': 'http://test'}, 'test', 'orders',
+                                                 OrderFilter(after=datetime(2022, 1, 1)))
+                store = reconcile.load_store(reconcile.store_path('orders', 'test'))
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(counts['deleted'], 1)
+        self.assertTrue(store[3].get('_deleted'))
+        self.assertNotIn('_deleted', store[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Shared configuration, checkpoint, sink and fetch-loop code for the REST fetchers.
+
+Every entity export (products, titles, orders) runs the same pipeline:
+fetch a page, extract records, write them to one or more sinks, checkpoint.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import zlib
+import queue
+import requests
+import threading
+from datetime import timedelta
+from dotenv import load_dotenv
+from run_metrics import metrics
+from page_archive import PageArchive
+from http_cache import HttpCache
+from json_codec import DECODERS, JsonDecoder, to_plain, iter_items, ijson
+
+CONFIG_FILE = 'config.json'
+REST_REQUIRED_KEYS = ['CONSUMER_KEY', 'CONSUMER_SECRET', 'SITE_URL']
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 100
+# Ascending IDs keep pages stable while new records are created during a run
+STABLE_ORDER = {'orderby': 'id', 'order': 'asc'}
+STREAM_CHUNK_SIZE = 64 * 1024
+# Attempts after a failed request, waiting RETRY_BACKOFF seconds and doubling each time
+RETRIES = 3
+RETRY_BACKOFF = 2.0
+
+class FetchError(Exception):
+    """A page could not be fetched even after retrying."""
+
+def read_config_file():
+    """Read config.json, returning an empty dict if it is missing or invalid."""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        print(f'⚠️ Warning: Error reading {CONFIG_FILE}: {e}')
+        return {}
+
+def list_websites():
+    """List website names from config.json, or 'default' when only .env is configured."""
+    load_dotenv()
+    websites = list(read_config_file().get('websites', {}).keys())
+    if not websites and os.getenv('CONSUMER_KEY'):
+        websites.append('default')
+    return websites
+
+def get_website_config(website_name=None):
+    """
+    Get configuration for a website without validating it.
+
+    Order of precedence: the named website, the default_website, the first
+    website in config.json, then environment variables.
+    """
+    load_dotenv()
+    config_data = read_config_file()
+    websites = config_data.get('websites', {})
+    default_website = config_data.get('default_website')
+
+    if website_name and website_name in websites:
+        return websites[website_name]
+    if default_website in websites:
+        return websites[default_website]
+    if websites:
+        return list(websites.values())[0]
+
+    return {
+        'CONSUMER_KEY': os.getenv('CONSUMER_KEY'),
+        'CONSUMER_SECRET': os.getenv('CONSUMER_SECRET'),
+        'SITE_URL': os.getenv('SITE_URL'),
+        'DOMAIN': os.getenv('DOMAIN_1')
+    }
+
+def load_configuration(website_name=None, required_keys=REST_REQUIRED_KEYS):
+    """Load and validate configuration from config.json or environment variables."""
+    config = get_website_config(website_name)
+    missing_keys = [key for key in required_keys if not config.get(key)]
+    if missing_keys:
+        print(f"❌ Error: Missing required configuration: {', '.join(missing_keys)}")
+        sys.exit(1)
+    print(f"✓ Loaded configuration for {website_name or 'default website'}")
+    return config
+
+def select_website_interactive():
+    """Interactive website selection, returning (website_name, config)."""
+    websites = list_websites()
+    if not websites:
+        print("No websites found in configuration.")
+        return None, None
+
+    print("\nAvailable websites:")
+    print("-" * 40)
+    for i, website in enumerate(websites, 1):
+        config = get_website_config(website if website != 'default' else None)
+        print(f"{i}. {website}")
+        print(f"   URL: {config.get('SITE_URL', 'Unknown URL')}")
+        print(f"   Domain: {config.get('DOMAIN', 'Unknown Domain')}")
+        print()
+
+    while True:
+        try:
+            choice = input(f"Select website (1-{len(websites)}) or press Enter for default: ").strip()
+            if not choice:
+                selected = websites[0]
+                print(f"Using default website: {selected}")
+                break
+            choice_num = int(choice)
+            if 1 <= choice_num <= len(websites):
+                selected = websites[choice_num - 1]
+                print(f"Selected website: {selected}")
+                break
+            print(f"Please enter a number between 1 and {len(websites)}")
+        except ValueError:
+            print("Please enter a valid number")
+        except KeyboardInterrupt:
+            print("\nOperation cancelled")
+            sys.exit(0)
+
+    return selected, get_website_config(selected if selected != 'default' else None)
+
+class SeenIds:
+    """Set of non-negative integer IDs stored as a bitmap, one bit per ID."""
+
+    def __init__(self, bits=b''):
+        self.bits = bytearray(bits)
+
+    def __contains__(self, item_id):
+        byte = item_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (item_id & 7)))
+
+    def add(self, item_id):
+        """Add an ID, returning False if it was already present."""
+        if item_id in self:
+            return False
+        byte = item_id >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        self.bits[byte] |= 1 << (item_id & 7)
+        return True
+
+    def copy(self):
+        return SeenIds(self.bits)
+
+class Checkpoint:
+    """Next page to fetch and the IDs already written, persisted so interrupted runs resume."""
+
+    def __init__(self, path):
+        self.path = path
+        self.seen_path = f"{os.path.splitext(path)[0]}_seen.bin"
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return max(1, int(f.read().strip()))
+        except FileNotFoundError:
+            return 1
+        except ValueError:
+            print(f"⚠️ Warning: Invalid page number in {self.path}. Starting from page 1.")
+            return 1
+
+    def load_seen(self):
+        """IDs written by earlier runs, or None if they were not saved (e.g. by an older version) or are unreadable."""
+        try:
+            with open(self.seen_path, 'rb') as f:
+                return SeenIds(zlib.decompress(f.read()))
+        except (FileNotFoundError, zlib.error):
+            return None
+
+    def save(self, page, seen=None):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            if seen is not None:
+                with open(f"{self.seen_path}.tmp", 'wb') as f:
+                    f.write(zlib.compress(bytes(seen.bits)))
+                os.replace(f"{self.seen_path}.tmp", self.seen_path)
+            with open(self.path, 'w') as f:
+                f.write(str(page))
+        except IOError as e:
+            print(f"⚠️ Warning: Could not save current page: {e}")
+
+class CsvSink:
+    """CSV output kept open for the whole run; appends when resuming.
+
+    The row function maps a record to a CSV row, or None to skip it.
+    """
+
+    def __init__(self, path, header, row=None, label='records'):
+        self.path, self.header, self.label = path, header, label
+        self.row = row or (lambda record: record)
+        self.file = self.writer = None
+
+    def open(self, resume):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        append = resume and os.path.exists(self.path)
+        self.file = open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file, quoting=csv.QUOTE_ALL)
+        if not append:
+            self.writer.writerow(self.header)
+
+    def write(self, records):
+        rows = [row for row in map(self.row, records) if row is not None]
+        self.writer.writerows(rows)
+        self.file.flush()
+        print(f"✓ Successfully wrote {len(rows)} {self.label} to {self.path}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+class JsonlSink:
+    """Raw API items as one JSON object per line; appends when resuming."""
+
+    def __init__(self, path, label='raw records'):
+        self.path, self.label = path, label
+        self.file = None
+
+    def open(self, resume):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def write(self, records):
+        self.file.writelines(json.dumps(to_plain(record), ensure_ascii=False) + '\n' for record in records)
+        self.file.flush()
+        print(f"✓ Successfully wrote {len(records)} {self.label} to {self.path}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+def page_query(config, page, per_page, params=None):
+    """Query parameters for one page of a REST collection."""
+    return {
+        'page': page,
+        'per_page': per_page,
+        'consumer_key': config['CONSUMER_KEY'],
+        'consumer_secret': config['CONSUMER_SECRET'],
+        **(params or {})
+    }
+
+def fetch_page(session, config, endpoint, page, per_page=DEFAULT_PER_PAGE, params=None, cache=None, decoder=None):
+    """
+    Fetch one page of a WooCommerce REST collection.
+
+    With a cache, the request carries If-None-Match / If-Modified-Since and a
+    304 Not Modified answer is served from the cached body.
+
+    Returns:
+        list: Decoded items, or None if the request failed
+    """
+    query = page_query(config, page, per_page, params)
+    url = f"{config['SITE_URL']}/wp-json/wc/v3/{endpoint}"
+    key = cache.key(url, query) if cache else None
+    try:
+        with metrics.phase('network'):
+            response = session.get(url, params=query, headers=cache.validators(key) if cache else None)
+        metrics.add('requests')
+        metrics.add('bytes', len(response.content))
+        body = response.content
+        if response.status_code == 304 and cache:
+            body = cache.load(key)
+            if body is None:
+                raise ValueError("304 Not Modified for an evicted cache entry")
+            metrics.add('cache_hits')
+        else:
+            response.raise_for_status()
+            if cache:
+                cache.store(key, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        with metrics.phase('json_decode'):
+            return (decoder or JsonDecoder()).loads(body)
+    except requests.RequestException as e:
+        metrics.add('errors')
+        print(f"❌ Error fetching data from API: {e}")
+    except ValueError as e:
+        metrics.add('errors')
+        print(f"❌ Error processing API response: {e}")
+    return None
+
+def stream_page(session, config, endpoint, page, per_page=DEFAULT_PER_PAGE, params=None, extract=None):
+    """
+    Fetch one page and extract each item as it is parsed from the response stream.
+
+    Only the extracted records are kept, so memory per page is bounded by the
+    records rather than the raw body and full object graph.
+
+    Returns:
+        tuple: (records, number of items on the page), or None if the request failed
+    """
+    records, count = [], 0
+    try:
+        with metrics.phase('network'):
+            response = session.get(f"{config['SITE_URL']}/wp-json/wc/v3/{endpoint}",
+                                   params=page_query(config, page, per_page, params), stream=True)
+        metrics.add('requests')
+        with response:
+            response.raise_for_status()
+            with metrics.phase('stream_extract'):
+                for item in iter_items(response.iter_content(STREAM_CHUNK_SIZE)):
+                    count += 1
+                    record = extract(item)
+                    if record is not None:
+                        records.append(record)
+            metrics.add('bytes', response.raw.tell())
+        return records, count
+    except requests.RequestException as e:
+        metrics.add('errors')
+        print(f"❌ Error fetching data from API: {e}")
+    except ValueError as e:
+        metrics.add('errors')
+        print(f"❌ Error processing API response: {e}")
+    return None
+
+def with_retries(fetch, label, retries=RETRIES, backoff=RETRY_BACKOFF):
+    """
+    Call fetch() until it returns something other than None, backing off exponentially.
+
+    Raises:
+        FetchError: If every attempt failed
+    """
+    for attempt in range(retries + 1):
+        result = fetch()
+        if result is not None:
+            return result
+        if attempt < retries:
+            metrics.add('retries')
+            print(f"🔁 Retrying {label} in {backoff * 2 ** attempt:g}s...")
+            time.sleep(backoff * 2 ** attempt)
+    raise FetchError(f"Could not fetch {label} after {retries + 1} attempts")
+
+def extract_records(items, extract):
+    """Apply an extract function to each item, dropping items it rejects."""
+    with metrics.phase('extract'):
+        records = []
+        for item in items:
+            record = extract(item)
+            if record is not None:
+                records.append(record)
+        return records
+
+def find_missing_ids(session, config, endpoint, params, seen, decoder=None):
+    """
+    List every ID in the collection with _fields=id and return those not yet seen.
+
+    Raises:
+        FetchError: If a listing page still fails after retrying
+    """
+    missing, page = [], 1
+    while True:
+        items = with_retries(lambda: fetch_page(session, config, endpoint, page, MAX_PER_PAGE,
+                                                {**(params or {}), **STABLE_ORDER, '_fields': 'id'}, decoder=decoder),
+                             f"ID listing page {page}")
+        missing += [item['id'] for item in items if item['id'] not in seen]
+        if len(items) < MAX_PER_PAGE:
+            return missing
+        page += 1
+
+def plan_export(config, endpoint, label='records', per_page=DEFAULT_PER_PAGE, params=None, delay=1.0,
+                concurrency=1, gap_fill=True, samples=3):
+    """
+    Print the expected pages, requests, bytes and wall time of an export, then exit.
+
+    per_page=1 requests read X-WP-Total and sample the round trip; one full
+    page is timed to estimate transfer size and page latency.
+    """
+    url = f"{config['SITE_URL']}/wp-json/wc/v3/{endpoint}"
+    try:
+        with requests.Session() as session:
+            latencies = []
+            for _ in range(samples):
+                started = time.perf_counter()
+                response = session.get(url, params=page_query(config, 1, 1, params))
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+            total = int(response.headers.get('X-WP-Total', 0))
+            started = time.perf_counter()
+            response = session.get(url, params=page_query(config, 1, per_page, params))
+            page_seconds = time.perf_counter() - started
+            response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"❌ Error fetching data from API: {e}")
+        sys.exit(1)
+
+    pages = -(-total // per_page)
+    listing = -(-total // MAX_PER_PAGE) if gap_fill else 0
+    total_bytes = len(response.content) / max(1, min(per_page, total)) * total
+    eta = pages * (page_seconds + delay) / concurrency
+    print(f"\n📋 Plan for {total} {label} at {config['SITE_URL']}")
+    print(f"   Pages: {pages} of {per_page}")
+    print(f"   Requests: {pages + listing}" + (f" ({listing} for the gap-fill listing)" if listing else ""))
+    print(f"   Transfer: ~{total_bytes / 1048576:.1f} MB")
+    print(f"   Latency: {min(latencies) * 1000:.0f} ms round trip, {page_seconds * 1000:.0f} ms per page")
+    print(f"   ETA: {timedelta(seconds=round(eta))} at concurrency {concurrency} with {delay:g}s between requests")
+    sys.exit(0)
+
+def add_pipeline_arguments(parser):
+    """Add the shared pipeline options to a REST fetcher's argument parser."""
+    parser.add_argument('--plan', action='store_true',
+                        help='Estimate pages, requests, transfer size and duration without exporting')
+    parser.add_argument('--archive', action='store_true', help='Save every raw API page as compressed JSONL under data/archive/')
+    parser.add_argument('--replay', action='store_true', help='Re-run extraction from data/archive/ without network access')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='Send conditional requests and reuse unchanged pages from data/http_cache/')
+    parser.add_argument('--http-cache-mb', type=int, default=256, help='HTTP cache size limit in MB (default: 256)')
+    parser.add_argument('--json-decoder', choices=DECODERS, default='auto',
+                        help='JSON decoder for API pages (default: auto, preferring orjson then simdjson)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse each page incrementally as it downloads, keeping only extracted records (uses ijson)')
+    parser.add_argument('--queue-depth', type=int, default=2,
+                        help='Pages buffered between the fetch, extract and write stages (default: 2)')
+    parser.add_argument('--no-gap-fill', action='store_true',
+                        help='Skip the final pass that fetches records missed while pages shifted')
+    parser.add_argument('--delay', type=float, default=1.0,
+                        help='Seconds to wait between page requests to respect API rate limits (default: 1)')
+
+def pipeline_options(args, website_name, endpoint):
+    """Build run_pipeline keyword arguments from the shared command line options."""
+    archive = PageArchive(website_name, endpoint)
+    if args.stream and (args.archive or args.replay or args.http_cache):
+        print("⚠️ Warning: --stream cannot be combined with --archive, --replay or --http-cache. Streaming disabled.")
+        args.stream = False
+    elif args.stream and ijson is None:
+        print("⚠️ Warning: ijson is not installed. Pages will be buffered before parsing.")
+    return {
+        'stream': args.stream,
+        'archive': archive if args.archive else None,
+        'replay': archive if args.replay else None,
+        'cache': HttpCache(args.http_cache_mb * 1024 * 1024) if args.http_cache else None,
+        'decoder': JsonDecoder(args.json_decoder),
+        'queue_depth': max(1, args.queue_depth),
+        'gap_fill': not args.no_gap_fill,
+        'delay': max(0.0, args.delay),
+        'plan': args.plan
+    }
+
+def run_pipeline(config, endpoint, extract, sinks, checkpoint, label='records',
+                 per_page=DEFAULT_PER_PAGE, params=None, delay=1.0, archive=None, replay=None,
+                 cache=None, decoder=None, stream=False, queue_depth=2, gap_fill=True, plan=False):
+    """
+    Page through a REST collection: fetch, extract, write to every sink, checkpoint.
+
+    The stages run concurrently, connected by bounded queues: a prefetch thread
+    requests page N+1 while page N is extracted, and a writer thread writes to
+    the sinks and saves the checkpoint. A full queue blocks the stage feeding it.
+
+    Pages are requested in ascending ID order and IDs already written are kept
+    in a bitmap saved with the checkpoint, so records that shift between pages
+    are written once. A final gap-fill pass fetches any that were skipped.
+    Failed requests are retried with backoff; if a page or the gap-fill still
+    fails, FetchError is raised and the checkpoint keeps the last written page.
+
+    Args:
+        config (dict): Website configuration
+        endpoint (str): Collection path under /wp-json/wc/v3/, e.g. 'products'
+        extract (callable): Maps an API item to a record, or None to skip it
+        sinks (list): Sinks with open(resume), write(records) and close()
+        checkpoint (Checkpoint): Resume position
+        label (str): Plural record name used in progress output
+        per_page (int): Page size
+        params (dict, optional): Extra query parameters
+        delay (float): Pause between requests to avoid API rate limits
+        archive (PageArchive, optional): Store each raw page as it is fetched, emptied first unless resuming
+        replay (PageArchive, optional): Read pages from this archive instead of the API,
+            starting at page 1 and leaving the checkpoint untouched
+        cache (HttpCache, optional): Conditional request cache for unchanged pages
+        decoder (JsonDecoder, optional): Page decoder, by default the fastest installed
+        stream (bool): Extract items while each response downloads instead of
+            decoding whole pages (ignored with archive, replay and cache)
+        queue_depth (int): Pages each queue holds before the stage feeding it waits
+        gap_fill (bool): After the last page, fetch records whose IDs were never seen
+        plan (bool): Only print the export plan from plan_export and exit
+
+    Returns:
+        int: Number of records written
+    """
+    if plan:
+        plan_export(config, endpoint, label, per_page, {**STABLE_ORDER, **(params or {})}, delay, gap_fill=gap_fill)
+    first_page = 1 if replay else checkpoint.load()
+    stream = stream and not (archive or replay or cache)
+    params = {**STABLE_ORDER, **(params or {})}
+    # seen tracks extracted IDs; committed follows the writer and is saved with the checkpoint
+    seen = checkpoint.load_seen() if first_page > 1 else SeenIds()
+    if seen is None:
+        # Without the written IDs gap-fill would append every earlier record again
+        print(f"⚠️ Warning: No record of the {label} already written. Starting from page 1.")
+        first_page, seen = 1, SeenIds()
+    if archive and first_page == 1 and not replay:
+        archive.clear()
+    committed = seen.copy()
+    decoder = decoder or JsonDecoder()
+    session = requests.Session()
+    fetched, extracted = queue.Queue(queue_depth), queue.Queue(queue_depth)
+    stop = threading.Event()
+    failures = []
+    total, last_page, complete = 0, False, False
+
+    def read_new(read):
+        """Call read(extract_item) to extract one page, marking its IDs seen only once the whole page was read."""
+        page_ids = set()
+
+        def extract_item(item):
+            item_id = item.get('id')
+            if item_id is not None and (item_id in seen or item_id in page_ids):
+                metrics.add('duplicates')
+                return None
+            if item_id is not None:
+                page_ids.add(item_id)
+            return item_id, extract(item)
+
+        result = read(extract_item)
+        if result is not None:
+            for item_id in page_ids:
+                seen.add(item_id)
+        return result
+
+    def hand_to_writer(page, pairs):
+        records = [record for _, record in pairs if record is not None]
+        put(extracted, (page, records, [item_id for item_id, _ in pairs if item_id is not None]))
+        return len(records)
+
+    def put(target, item):
+        while not stop.is_set():
+            try:
+                return target.put(item, timeout=0.1)
+            except queue.Full:
+                pass
+
+    def get(source):
+        while not stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def fetch_stage():
+        page = first_page
+        try:
+            while not stop.is_set():
+                if replay:
+                    payload = replay.load(page)
+                elif stream:
+                    payload, count = with_retries(lambda: read_new(
+                        lambda extract_item: stream_page(session, config, endpoint, page, per_page, params, extract_item)),
+                        f"page {page}")
+                else:
+                    payload = with_retries(
+                        lambda: fetch_page(session, config, endpoint, page, per_page, params, cache, decoder), f"page {page}")
+                    if payload and archive:
+                        with metrics.phase('archive_write'):
+                            archive.save(page, payload)
+                if not stream:
+                    count = len(payload) if payload else 0
+                put(fetched, (page, count, payload))
+                if not count or (count < per_page and not replay):
+                    break
+                page += 1
+                if not replay:
+                    with metrics.phase('rate_limit_sleep'):
+                        stop.wait(delay)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            put(fetched, None)
+
+    def write_stage():
+        while True:
+            batch = extracted.get()
+            if batch is None:
+                break
+            if failures:
+                continue
+            page, records, ids = batch
+            try:
+                with metrics.phase('csv_write'):
+                    for sink in sinks:
+                        sink.write(records)
+                if not replay:
+                    for item_id in ids:
+                        committed.add(item_id)
+                    checkpoint.save(page + 1, committed)
+            except Exception as e:
+                failures.append(e)
+                stop.set()
+
+    for sink in sinks:
+        sink.open(resume=first_page > 1)
+    fetcher = threading.Thread(target=fetch_stage, daemon=True)
+    writer = threading.Thread(target=write_stage, daemon=True)
+    fetcher.start()
+    writer.start()
+
+    try:
+        while True:
+            batch = get(fetched)
+            if batch is None:
+                break
+            page, count, payload = batch
+            metrics.gauge('fetch_queue', fetched.qsize())
+            metrics.gauge('write_queue', extracted.qsize())
+            if not count:
+                if page == 1:
+                    print(f"❌ No {label} found.")
+                else:
+                    print(f"✓ No more {label} to fetch.")
+                    complete, page = True, page - 1
+                break
+
+            print(f"{'📂 Replayed' if replay else '📥 Fetched'} page {page} "
+                  f"(queued: {fetched.qsize()} to extract, {extracted.qsize()} to write)")
+            written = hand_to_writer(page, payload if stream else read_new(lambda extract_item: extract_records(payload, extract_item)))
+            total += written
+            metrics.add('records', written)
+            metrics.gauge('current_page', page)
+
+            if count < per_page and not replay:
+                last_page = complete = True
+                break
+
+        if complete and gap_fill and not replay and not failures:
+            fetcher.join()
+            missing = find_missing_ids(session, config, endpoint, params, seen, decoder)
+            archive_page = page
+            if missing:
+                print(f"🔍 Gap-fill: fetching {len(missing)} {label} missed between pages")
+            for start in range(0, len(missing), MAX_PER_PAGE):
+                include = ','.join(map(str, missing[start:start + MAX_PER_PAGE]))
+                items = with_retries(lambda: fetch_page(session, config, endpoint, 1, MAX_PER_PAGE,
+                                                        {**params, 'include': include}, cache, decoder), "gap-fill")
+                if archive:
+                    # Archived after the last page so --replay reads gap-filled records too
+                    archive_page += 1
+                    with metrics.phase('archive_write'):
+                        archive.save(archive_page, items)
+                written = hand_to_writer(page, read_new(lambda extract_item: extract_records(items, extract_item)))
+                total += written
+                metrics.add('records', written)
+                metrics.add('gap_filled', written)
+    finally:
+        stop.set()
+        extracted.put(None)
+        writer.join()
+        fetcher.join()
+        for sink in sinks:
+            sink.close()
+        session.close()
+        if cache:
+            cache.close()
+
+    if failures:
+        raise failures[0]
+    if last_page:
+        print("✓ Reached the last page.")
+    return total